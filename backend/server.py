@@ -1,22 +1,249 @@
-from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from fastapi.exceptions import RequestValidationError
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, model_validator
 from typing import List, Optional, Dict
 import uuid
+import re
+import html
+import json
+import base64
+import hashlib
+import hmac
+import marshal
+import pickle
+import cProfile
+import tracemalloc
 from datetime import datetime, timedelta
 import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+try:
+    import aiosmtplib  # optional - only needed for EMAIL_TRANSPORT=asyncio
+except ImportError:
+    aiosmtplib = None
 import asyncio
+import sys
+import traceback
 from functools import wraps
 from enum import Enum
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+from bisect import bisect_left
+
+# =================== METRICS ===================
+#
+# Prometheus text-format metrics served at /metrics. Every series is created once per
+# route template / collection / email kind and updated in place, so a request costs two
+# clock reads and a few integer increments. Histograms keep per-bucket counts and only
+# cumulate them when /metrics is scraped.
+
+HTTP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+MONGO_UNTRACKED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue",
+                            "buildInfo", "endSessions", "killCursors"}
+
+class Histogram:
+    """Fixed-bucket histogram; counts[i] is the number of observations in bucket i only"""
+    
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def exposition(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+def metric_labels(**labels) -> str:
+    """Render a label set once; values are escaped per the text exposition format"""
+    escaped = {
+        key: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for key, value in labels.items()
+    }
+    return ",".join(f'{key}="{value}"' for key, value in escaped.items())
+
+class RouteMetrics:
+    """Request counters, latency histogram and in-flight gauge for one route template"""
+    
+    __slots__ = ("labels", "in_progress", "latency", "statuses")
+    
+    def __init__(self, method: str, route: str):
+        self.labels = metric_labels(method=method, route=route)
+        self.in_progress = 0
+        self.latency = Histogram(HTTP_LATENCY_BUCKETS)
+        self.statuses = {}  # status code -> count
+    
+    def observe(self, status: int, seconds: float):
+        self.latency.observe(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """The app's one pymongo command listener: times every command per (collection, command)
+    and hands each one, with its redacted query shape, to the slow query log when attached.
+    
+    Motor runs pymongo on its own threads, so updates are taken under a lock.
+    """
+    
+    def __init__(self):
+        self._pending = {}  # (connection_id, request_id) -> (collection, command, shape)
+        self._lock = threading.Lock()
+        self.latency = {}  # (collection, command) -> Histogram
+        self.failures = {}  # (collection, command) -> count
+        self.slow_log = None  # SlowCommandLog, attached once it's configured
+    
+    def started(self, event):
+        if event.command_name in MONGO_UNTRACKED_COMMANDS:
+            return
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.command.get("collection", "")
+        shape = command_query_shape(event.command_name, event.command) if self.slow_log is not None else ""
+        self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name, shape)
+    
+    def succeeded(self, event):
+        self._finish(event, failure=None)
+    
+    def failed(self, event):
+        self._finish(event, failure=str(event.failure.get("errmsg", event.failure)))
+    
+    def _finish(self, event, failure: Optional[str]):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        collection, command, shape = pending
+        key = (collection, command)
+        with self._lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(MONGO_LATENCY_BUCKETS)
+            histogram.observe(event.duration_micros / 1_000_000)
+            if failure is not None:
+                self.failures[key] = self.failures.get(key, 0) + 1
+        if self.slow_log is not None:
+            self.slow_log.record(collection, command, shape, event.duration_micros / 1000, failure)
+
+class MetricsRegistry:
+    """All series exported at /metrics"""
+    
+    def __init__(self):
+        self.routes: Dict[tuple, RouteMetrics] = {}
+        self.mongo = MongoCommandMetrics()
+        self.email_outcomes: Dict[tuple, int] = {}  # (kind, outcome) -> count
+        self.collectors = []  # callables returning extra exposition lines at scrape time
+    
+    def route(self, method: str, route: str) -> RouteMetrics:
+        key = (method, route)
+        if key not in self.routes:
+            self.routes[key] = RouteMetrics(method, route)
+        return self.routes[key]
+    
+    def email_outcome(self, kind: str, outcome: str):
+        key = (kind, outcome)
+        self.email_outcomes[key] = self.email_outcomes.get(key, 0) + 1
+    
+    def render(self) -> str:
+        lines = [
+            "# HELP qnova_http_requests_total HTTP requests by route template and status code.",
+            "# TYPE qnova_http_requests_total counter",
+        ]
+        routes = list(self.routes.values())
+        for route in routes:
+            for status, count in list(route.statuses.items()):
+                lines.append(f'qnova_http_requests_total{{{route.labels},status="{status}"}} {count}')
+        lines += [
+            "# HELP qnova_http_requests_in_progress HTTP requests currently being handled.",
+            "# TYPE qnova_http_requests_in_progress gauge",
+        ]
+        lines += [f"qnova_http_requests_in_progress{{{route.labels}}} {route.in_progress}" for route in routes]
+        lines += [
+            "# HELP qnova_http_request_duration_seconds Time spent in the route handler.",
+            "# TYPE qnova_http_request_duration_seconds histogram",
+        ]
+        for route in routes:
+            lines += route.latency.exposition("qnova_http_request_duration_seconds", route.labels)
+        
+        with self.mongo._lock:
+            mongo_latency = list(self.mongo.latency.items())
+            mongo_failures = list(self.mongo.failures.items())
+        lines += [
+            "# HELP qnova_mongo_command_duration_seconds MongoDB command round trips by collection.",
+            "# TYPE qnova_mongo_command_duration_seconds histogram",
+        ]
+        for (collection, command), histogram in mongo_latency:
+            lines += histogram.exposition("qnova_mongo_command_duration_seconds",
+                                          metric_labels(collection=collection, command=command))
+        lines += [
+            "# HELP qnova_mongo_command_failures_total MongoDB commands that returned an error.",
+            "# TYPE qnova_mongo_command_failures_total counter",
+        ]
+        lines += [f"qnova_mongo_command_failures_total{{{metric_labels(collection=collection, command=command)}}} {count}"
+                  for (collection, command), count in mongo_failures]
+        
+        lines += [
+            "# HELP qnova_email_deliveries_total Outbox delivery outcomes (sent, retry, dead, deferred).",
+            "# TYPE qnova_email_deliveries_total counter",
+        ]
+        lines += [f"qnova_email_deliveries_total{{{metric_labels(kind=kind, outcome=outcome)}}} {count}"
+                  for (kind, outcome), count in list(self.email_outcomes.items())]
+        for collector in self.collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+class MetricsRoute(APIRoute):
+    """APIRoute that records its requests under its path template (e.g. /api/calendar/{date})"""
+    
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route_metrics = metrics.route(",".join(sorted(self.methods)), self.path_format)
+        
+        async def timed_handler(request: Request) -> Response:
+            route_metrics.in_progress += 1
+            start = monotonic()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                route_metrics.in_progress -= 1
+                route_metrics.observe(status, monotonic() - start)
+        
+        return timed_handler
 
 # Stripe payment integration (temporarily disabled for Railway deployment)
 # from emergentintegrations.payments.stripe.checkout import StripeCheckout, CheckoutSessionResponse, CheckoutStatusResponse, CheckoutSessionRequest
@@ -24,6 +251,110 @@ from enum import Enum
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# =================== SLOW QUERY LOG ===================
+#
+# The metrics command listener also feeds per-query-shape stats for every command and the most
+# recent commands slower than MONGO_SLOW_COMMAND_MS. A shape is the command's filter
+# (or pipeline / update query) with every literal replaced by "?", so
+# {"date": "2025-01-01", "time": {"$in": [...]}} and {"date": "2025-02-03", "time": {"$in": [...]}}
+# are counted together.
+
+MONGO_SLOW_COMMAND_MS = float(os.environ.get('MONGO_SLOW_COMMAND_MS', 100))
+MONGO_SLOW_LOG_SIZE = int(os.environ.get('MONGO_SLOW_LOG_SIZE', 200))
+MONGO_MAX_QUERY_SHAPES = 500  # shapes come from our own code; the cap only guards against surprises
+
+def redact_query_shape(value):
+    """Replace literal values with "?" while keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: redact_query_shape(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        # $and/$or clauses and pipelines keep their structure; plain value lists ($in etc.) collapse
+        return [redact_query_shape(item) for item in value]
+    return "?"
+
+def command_query_shape(command_name: str, command: dict) -> str:
+    """Redacted filter / pipeline of a command as a compact JSON string"""
+    if command_name == "find":
+        shape = {"filter": redact_query_shape(command.get("filter", {}))}
+        if command.get("sort"):
+            shape["sort"] = list(command["sort"])
+    elif command_name == "aggregate":
+        shape = {"pipeline": redact_query_shape(command.get("pipeline", []))}
+    elif command_name in ("count", "findAndModify", "distinct"):
+        shape = {"filter": redact_query_shape(command.get("query", {}))}
+    elif command_name == "update":
+        shape = {"filter": [redact_query_shape(update.get("q", {})) for update in command.get("updates", [])[:1]]}
+    elif command_name == "delete":
+        shape = {"filter": [redact_query_shape(delete.get("q", {})) for delete in command.get("deletes", [])[:1]]}
+    else:
+        return ""
+    return json.dumps(shape, separators=(",", ":"))
+
+class SlowCommandLog:
+    """Per-shape command stats plus a ring buffer of the slowest recent commands,
+    fed by the MongoCommandMetrics listener"""
+    
+    def __init__(self, threshold_ms: float = MONGO_SLOW_COMMAND_MS, size: int = MONGO_SLOW_LOG_SIZE):
+        self.threshold_ms = threshold_ms
+        self.slow = deque(maxlen=size)
+        self._shapes = {}  # (collection, command, shape) -> [count, total_ms, max_ms, slow_count, failures]
+        self._lock = threading.Lock()
+    
+    def record(self, collection: str, command: str, shape: str, duration_ms: float, failure: Optional[str]):
+        key = (collection, command, shape)
+        slow = duration_ms >= self.threshold_ms
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is None and len(self._shapes) < MONGO_MAX_QUERY_SHAPES:
+                stats = self._shapes[key] = [0, 0.0, 0.0, 0, 0]
+            if stats is not None:
+                stats[0] += 1
+                stats[1] += duration_ms
+                stats[2] = max(stats[2], duration_ms)
+                stats[3] += slow
+                stats[4] += failure is not None
+            if slow:
+                self.slow.append({
+                    "at": datetime.utcnow().isoformat(),
+                    "collection": collection,
+                    "command": command,
+                    "shape": shape,
+                    "duration_ms": round(duration_ms, 2),
+                    "error": failure
+                })
+    
+    def report(self, limit: int) -> Dict:
+        with self._lock:
+            slow = list(self.slow)
+            shapes = [
+                {
+                    "collection": collection,
+                    "command": command,
+                    "shape": shape,
+                    "count": count,
+                    "total_ms": round(total_ms, 2),
+                    "avg_ms": round(total_ms / count, 2),
+                    "max_ms": round(max_ms, 2),
+                    "slow": slow_count,
+                    "failures": failures
+                }
+                for (collection, command, shape), (count, total_ms, max_ms, slow_count, failures) in self._shapes.items()
+            ]
+        shapes.sort(key=lambda shape: shape["total_ms"], reverse=True)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "slow_commands": slow[::-1][:limit],  # newest first
+            "query_shapes": shapes[:limit]  # most total time first
+        }
+    
+    def reset(self):
+        with self._lock:
+            self.slow.clear()
+            self._shapes.clear()
+
+slow_command_log = SlowCommandLog()
+metrics.mongo.slow_log = slow_command_log
+
 # MongoDB connection with production fallback and error handling
 def get_mongo_connection():
     # Try environment variable first
@@ -47,7 +378,7 @@ def get_mongo_connection():
     return mongo_url
 
 mongo_url = get_mongo_connection()
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[metrics.mongo])
 db_name = os.environ.get('DB_NAME', 'qnova_vr')
 db = client[db_name]
 
@@ -60,6 +391,61 @@ GMAIL_USER = os.environ.get('GMAIL_USER', 'qnovavr.de@gmail.com')
 GMAIL_APP_PASSWORD = os.environ.get('GMAIL_APP_PASSWORD')
 SMTP_SERVER = 'smtp.gmail.com'
 SMTP_PORT = 587
+SMTP_SSL_PORT = 465
+SMTP_POOL_SIZE = int(os.environ.get('SMTP_POOL_SIZE', 4))
+SMTP_POOL_MAX_IDLE_SECONDS = float(os.environ.get('SMTP_POOL_MAX_IDLE_SECONDS', 60))
+EMAIL_TRANSPORT = os.environ.get('EMAIL_TRANSPORT', 'threaded')  # threaded (smtplib) or asyncio (aiosmtplib)
+ASYNC_SMTP_MAX_CONNECTIONS = int(os.environ.get('ASYNC_SMTP_MAX_CONNECTIONS', 10))
+SMTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('SMTP_CONNECT_TIMEOUT_SECONDS', 10))  # connect, TLS handshake, login
+SMTP_COMMAND_TIMEOUT_SECONDS = float(os.environ.get('SMTP_COMMAND_TIMEOUT_SECONDS', 30))  # each command once connected
+SMTP_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('SMTP_CIRCUIT_FAILURE_THRESHOLD', 5))
+SMTP_CIRCUIT_RESET_SECONDS = float(os.environ.get('SMTP_CIRCUIT_RESET_SECONDS', 60))
+
+# Email outbox worker
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 20))
+EMAIL_OUTBOX_CONCURRENCY = int(os.environ.get('EMAIL_OUTBOX_CONCURRENCY', 4))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))
+EMAIL_OUTBOX_BASE_BACKOFF_SECONDS = 30
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = 3600
+EMAIL_OUTBOX_POLL_SECONDS = 5
+EMAIL_OUTBOX_LEASE_SECONDS = 300  # a "sending" entry whose worker died is retried after this
+
+# Owner digest mode: hold booking notifications and send one summary email per window
+# (or as soon as OWNER_DIGEST_MAX_BOOKINGS are waiting). Customer confirmations are never held.
+OWNER_DIGEST_ENABLED = os.environ.get('OWNER_DIGEST_ENABLED', 'false').lower() == 'true'
+OWNER_DIGEST_WINDOW_SECONDS = int(os.environ.get('OWNER_DIGEST_WINDOW_SECONDS', 300))
+OWNER_DIGEST_MAX_BOOKINGS = int(os.environ.get('OWNER_DIGEST_MAX_BOOKINGS', 20))
+
+# Thread pools for blocking work (sizes and queue limits per named executor)
+EMAIL_EXECUTOR_WORKERS = int(os.environ.get('EMAIL_EXECUTOR_WORKERS', 4))
+EMAIL_EXECUTOR_MAX_QUEUE = int(os.environ.get('EMAIL_EXECUTOR_MAX_QUEUE', 50))
+BLOCKING_EXECUTOR_WORKERS = int(os.environ.get('BLOCKING_EXECUTOR_WORKERS', 4))
+BLOCKING_EXECUTOR_MAX_QUEUE = int(os.environ.get('BLOCKING_EXECUTOR_MAX_QUEUE', 100))
+
+# Event loop monitor: lag sampling interval and the stall that triggers a stack snapshot
+LOOP_MONITOR_INTERVAL_SECONDS = float(os.environ.get('LOOP_MONITOR_INTERVAL_SECONDS', 0.25))
+LOOP_LAG_THRESHOLD_MS = float(os.environ.get('LOOP_LAG_THRESHOLD_MS', 200))
+LOOP_STALL_SNAPSHOT_COOLDOWN_SECONDS = 60  # at most one stack dump per minute
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# On-demand profiling (/api/admin/profile/*) is off unless PROFILING_TOKEN is set;
+# requests must send it in the X-Admin-Token header
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+MAX_PROFILE_SECONDS = 60
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Calendar configuration
+SLOT_GENERATION_BATCH_DAYS = 31  # days of default slots written per insert_many
+AVAILABILITY_CACHE_TTL_SECONDS = float(os.environ.get('AVAILABILITY_CACHE_TTL_SECONDS', 30))
+AVAILABILITY_CACHE_MAX_ENTRIES = int(os.environ.get('AVAILABILITY_CACHE_MAX_ENTRIES', 1024))
+MAX_PARTICIPANTS = 4  # largest group package (Group KAT VR Party, up to 4 people)
+MAX_SEARCH_HORIZON_DAYS = 180
+MAX_AVAILABILITY_RANGE_DAYS = 92
+
+# Admin list pagination - without ?limit a list returns what it always did (the first 1000)
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 1000
+NDJSON_BATCH_SIZE = 100  # documents per Motor batch while streaming
 
 # Create the main app without a prefix
 app = FastAPI(
@@ -75,10 +461,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # page cursor of the admin lists, read cross-origin by the frontend
 )
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=MetricsRoute)
 
 # Models
 class StatusCheck(BaseModel):
@@ -144,8 +531,15 @@ class SlotStatus(str, Enum):
     maintenance = "maintenance"
     blocked = "blocked"
 
+# Namespace for deterministic slot ids, so the same date/time/service always maps to one slot
+SLOT_ID_NAMESPACE = uuid.UUID("6f1c2d4e-8a3b-5c7d-9e0f-1a2b3c4d5e6f")
+
+def slot_key(date: str, time: str, service_type: str) -> str:
+    """Deterministic slot id derived from date + time + service type"""
+    return str(uuid.uuid5(SLOT_ID_NAMESPACE, f"{date}|{time}|{service_type}"))
+
 class TimeSlot(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = ""  # defaults to slot_key(date, time, service_type)
     date: str  # YYYY-MM-DD format
     time: str  # HH:MM format
     service_type: str  # KAT VR Gaming Session, PlayStation 5 VR Experience, etc.
@@ -154,6 +548,12 @@ class TimeSlot(BaseModel):
     customer_info: Optional[dict] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    @model_validator(mode="after")
+    def default_slot_key(self):
+        if not self.id:
+            self.id = slot_key(self.date, self.time, self.service_type)
+        return self
 
 class TimeSlotCreate(BaseModel):
     date: str
@@ -249,13 +649,491 @@ VR_PACKAGES = {
     )
 }
 
-def run_sync(func):
-    """Decorator to run sync function in thread pool"""
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, func, *args, **kwargs)
-    return wrapper
+class ExecutorSaturated(RuntimeError):
+    """Raised instead of queueing when a bounded executor is full"""
+
+class BoundedExecutor:
+    """Named thread pool with a cap on queued work and active/queued/rejected counters"""
+    
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-executor")
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+    
+    def _run(self, func, args, kwargs):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+        return result
+    
+    async def run(self, func, *args, **kwargs):
+        """Run func on the pool, or fail fast with ExecutorSaturated when the queue is full"""
+        with self._lock:
+            if self.active + self.queued >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.name} executor saturated ({self.active} active, {self.queued} queued)")
+            self.queued += 1
+            self.submitted += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._run, func, args, kwargs)
+    
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+    
+    def stats(self) -> Dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+EXECUTORS = {
+    "email": BoundedExecutor("email", EMAIL_EXECUTOR_WORKERS, EMAIL_EXECUTOR_MAX_QUEUE),
+    "blocking": BoundedExecutor("blocking", BLOCKING_EXECUTOR_WORKERS, BLOCKING_EXECUTOR_MAX_QUEUE),
+}
+
+def run_sync(executor: str = "blocking"):
+    """Decorator to run sync function in the named bounded thread pool"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await EXECUTORS[executor].run(func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+class EventLoopMonitor:
+    """Measures event-loop scheduling lag and samples executor queues.
+    
+    A task sleeps for `interval` and records how late it wakes up. A watchdog thread
+    watches that task's heartbeat; when the loop hasn't ticked for threshold_ms it logs
+    the loop thread's stack while the loop is still blocked, which points at the
+    blocking call itself rather than at whatever ran after it.
+    """
+    
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL_SECONDS, threshold_ms: float = LOOP_LAG_THRESHOLD_MS):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.lag = Histogram(LOOP_LAG_BUCKETS)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.last_stall = None
+        self.peak_queued = {name: 0 for name in EXECUTORS}
+        self._heartbeat = monotonic()
+        self._last_snapshot_at = None
+        self._loop_thread_id = None
+        self._task = None
+        self._stop = threading.Event()
+    
+    def start(self):
+        """Start measuring; must be called on the loop being monitored"""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._measure())
+        threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True).start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+    
+    async def _measure(self):
+        while True:
+            started = monotonic()
+            await asyncio.sleep(self.interval)
+            now = monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - started - self.interval)
+            self.lag.observe(lag)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            for name, executor in EXECUTORS.items():
+                self.peak_queued[name] = max(self.peak_queued[name], executor.queued)
+            if lag * 1000 >= self.threshold_ms:
+                logger.warning(f"⚠️ Event loop lag {lag * 1000:.0f} ms")
+    
+    def _watch(self):
+        reported_heartbeat = None
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked_ms = (monotonic() - heartbeat - self.interval) * 1000
+            if blocked_ms < self.threshold_ms or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat  # one snapshot per stall
+            self.stalls += 1
+            now = monotonic()
+            if self._last_snapshot_at is not None and now - self._last_snapshot_at < LOOP_STALL_SNAPSHOT_COOLDOWN_SECONDS:
+                continue
+            self._last_snapshot_at = now
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<event loop thread not found>"
+            self.last_stall = {"at": datetime.utcnow().isoformat(), "blocked_ms": round(blocked_ms), "stack": stack}
+            logger.warning(f"⚠️ Event loop blocked for {blocked_ms:.0f} ms, loop thread stack:\n{stack}")
+    
+    def stats(self) -> Dict:
+        return {
+            "interval_seconds": self.interval,
+            "threshold_ms": self.threshold_ms,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "samples": self.lag.count,
+            "stalls": self.stalls,
+            "peak_queued": dict(self.peak_queued),
+            "last_stall": self.last_stall
+        }
+    
+    def exposition(self) -> List[str]:
+        lines = [
+            "# HELP qnova_event_loop_lag_seconds How late the monitor task was woken by the event loop.",
+            "# TYPE qnova_event_loop_lag_seconds histogram",
+        ]
+        lines += self.lag.exposition("qnova_event_loop_lag_seconds", 'loop="main"')
+        lines += [
+            "# HELP qnova_event_loop_stalls_total Times the loop was blocked longer than the lag threshold.",
+            "# TYPE qnova_event_loop_stalls_total counter",
+            f'qnova_event_loop_stalls_total{{loop="main"}} {self.stalls}',
+        ]
+        for metric, kind, help_text, field in (
+            ("qnova_executor_active", "gauge", "Threads currently running work.", "active"),
+            ("qnova_executor_queued", "gauge", "Work items waiting for a thread.", "queued"),
+            ("qnova_executor_rejected_total", "counter", "Work rejected because the queue was full.", "rejected"),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{executor="{name}"}} {getattr(executor, field)}' for name, executor in EXECUTORS.items()]
+        lines += [
+            "# HELP qnova_executor_queued_peak Largest queue depth seen by the loop monitor.",
+            "# TYPE qnova_executor_queued_peak gauge",
+        ]
+        lines += [f'qnova_executor_queued_peak{{executor="{name}"}} {peak}' for name, peak in self.peak_queued.items()]
+        return lines
+
+loop_monitor = EventLoopMonitor()
+metrics.collectors.append(loop_monitor.exposition)
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of contacting a server the circuit breaker has given up on"""
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by threads and the event loop.
+    
+    closed: calls go through; failure_threshold failures in a row open the circuit.
+    open: calls fail fast with CircuitOpenError until reset_seconds have passed.
+    half_open: a single trial call is let through; success closes, failure re-opens.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.opens = 0
+        self.short_circuited = 0
+        self.last_error = None
+    
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through (0 when not open)"""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_seconds - monotonic())
+    
+    def before_call(self):
+        with self._lock:
+            if self.state == "open" and monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+            if self.state == "closed" or (self.state == "half_open" and not self._trial_running):
+                self._trial_running = self.state == "half_open"
+                return
+            self.short_circuited += 1
+        raise CircuitOpenError(f"{self.name} circuit is {self.state} after {self.consecutive_failures} failures "
+                               f"(last error: {self.last_error})")
+    
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"✅ {self.name} circuit closed again")
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_running = False
+    
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error) or type(error).__name__
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opens += 1
+                    logger.error(f"❌ {self.name} circuit opened after {self.consecutive_failures} failures: "
+                                 f"{self.last_error}")
+                self.state = "open"
+                self.opened_at = monotonic()
+            self._trial_running = False
+    
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "opens": self.opens,
+            "short_circuited": self.short_circuited,
+            "last_error": self.last_error
+        }
+
+# One breaker for every path to Gmail - both ports and both transports fail together
+smtp_circuit = CircuitBreaker("smtp", SMTP_CIRCUIT_FAILURE_THRESHOLD, SMTP_CIRCUIT_RESET_SECONDS)
+
+def smtp_rejects_message(error: Exception) -> bool:
+    """True when the server answered but permanently (5xx) refused this one message - a bad
+    address or content rather than an outage. Connection, timeout, auth and transient 4xx
+    errors return False and count against the circuit breaker.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+    elif isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        codes = [error.smtp_code]
+    elif aiosmtplib and isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        codes = [recipient.code for recipient in error.recipients]
+    elif aiosmtplib and isinstance(error, (aiosmtplib.SMTPSenderRefused, aiosmtplib.SMTPRecipientRefused,
+                                           aiosmtplib.SMTPDataError)):
+        codes = [error.code]
+    else:
+        return False
+    return bool(codes) and all(code >= 500 for code in codes)
+
+def record_smtp_error(error: Exception):
+    if smtp_rejects_message(error):
+        # The server is up and talking - only this message is bad
+        smtp_circuit.record_success()
+    else:
+        smtp_circuit.record_failure(error)
+
+class SMTPConnectionPool:
+    """Thread-safe pool of logged-in SMTP connections reused across sends.
+    
+    Idle connections are checked with NOOP before reuse and dropped once they've been
+    idle longer than max_idle_seconds (Gmail closes idle sessions on its own).
+    """
+    
+    def __init__(self, host: str, port: int, use_ssl: bool = False, starttls: bool = True,
+                 max_size: int = SMTP_POOL_SIZE, max_idle_seconds: float = SMTP_POOL_MAX_IDLE_SECONDS):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.starttls = starttls  # False only for local plain-text sinks
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = []  # (connection, released_at)
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.reuses = 0
+        self.discards = 0
+    
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_CONNECT_TIMEOUT_SECONDS)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=SMTP_CONNECT_TIMEOUT_SECONDS)
+            if self.starttls:
+                server.starttls()
+        server.login(GMAIL_USER, GMAIL_APP_PASSWORD)
+        # smtplib applies the socket timeout to every read/write, so a hung server frees the thread
+        server.sock.settimeout(SMTP_COMMAND_TIMEOUT_SECONDS)
+        self.connects += 1
+        return server
+    
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    @staticmethod
+    def _is_alive(server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+    
+    def acquire(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, released_at = self._idle.pop()
+            if monotonic() - released_at <= self.max_idle_seconds and self._is_alive(server):
+                self.reuses += 1
+                return server
+            self.discards += 1
+            self._close(server)
+        return self._connect()
+    
+    def release(self, server: smtplib.SMTP):
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append((server, monotonic()))
+                return
+        self._close(server)
+    
+    def discard(self, server: smtplib.SMTP):
+        self.discards += 1
+        self._close(server)
+    
+    def send_message(self, msg):
+        """Send through the circuit breaker; raises CircuitOpenError without touching the network"""
+        smtp_circuit.before_call()
+        try:
+            self._send_message(msg)
+        except Exception as e:
+            record_smtp_error(e)
+            raise
+        smtp_circuit.record_success()
+    
+    def _send_message(self, msg):
+        """Send over a pooled connection, retrying once on a fresh one if the server dropped it"""
+        server = self.acquire()
+        try:
+            server.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.discard(server)
+            server = self._connect()
+            try:
+                server.send_message(msg)
+            except Exception:
+                self.discard(server)
+                raise
+        except Exception:
+            self.discard(server)
+            raise
+        self.release(server)
+    
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+    
+    def stats(self) -> Dict:
+        return {
+            "idle": len(self._idle),
+            "max_size": self.max_size,
+            "connects": self.connects,
+            "reuses": self.reuses,
+            "discards": self.discards
+        }
+
+# STARTTLS pool for booking emails, implicit TLS pool for contact notifications
+smtp_pool = SMTPConnectionPool(SMTP_SERVER, SMTP_PORT)
+smtp_ssl_pool = SMTPConnectionPool(SMTP_SERVER, SMTP_SSL_PORT, use_ssl=True)
+
+class AsyncSMTPTransport:
+    """Event-loop native SMTP client (aiosmtplib) with reusable connections.
+    
+    tls is "starttls" (587), "implicit" (465) or "none" (local sinks). At most
+    max_connections sessions are open; further sends wait for a free one instead of
+    needing a thread each.
+    """
+    
+    def __init__(self, host: str, port: int, tls: str = "starttls", username: Optional[str] = GMAIL_USER,
+                 password: Optional[str] = GMAIL_APP_PASSWORD, max_connections: int = ASYNC_SMTP_MAX_CONNECTIONS):
+        self.host = host
+        self.port = port
+        self.tls = tls
+        self.username = username
+        self.password = password
+        self.max_connections = max_connections
+        self._idle = []
+        self._semaphore = None  # created lazily on the serving loop
+        self.connects = 0
+        self.sent = 0
+    
+    async def _connect(self):
+        if aiosmtplib is None:
+            raise RuntimeError("aiosmtplib is not installed - EMAIL_TRANSPORT=asyncio is unavailable")
+        smtp = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.tls == "implicit",
+            start_tls=self.tls == "starttls",
+            timeout=SMTP_COMMAND_TIMEOUT_SECONDS
+        )
+        await smtp.connect(timeout=SMTP_CONNECT_TIMEOUT_SECONDS)
+        if self.username and self.password:
+            await smtp.login(self.username, self.password)
+        self.connects += 1
+        return smtp
+    
+    @staticmethod
+    async def _close(smtp):
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+    
+    async def send_message(self, msg):
+        """Send through the circuit breaker; raises CircuitOpenError without touching the network"""
+        smtp_circuit.before_call()
+        try:
+            await self._send_message(msg)
+        except Exception as e:
+            record_smtp_error(e)
+            raise
+        smtp_circuit.record_success()
+    
+    async def _send_message(self, msg):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        async with self._semaphore:
+            smtp = self._idle.pop() if self._idle else None
+            if smtp is None or not smtp.is_connected:
+                smtp = await self._connect()
+            try:
+                try:
+                    await smtp.send_message(msg)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # Pooled session was dropped by the server - retry once on a fresh one
+                    smtp = await self._connect()
+                    await smtp.send_message(msg)
+            except Exception:
+                await self._close(smtp)
+                raise
+            self.sent += 1
+            self._idle.append(smtp)
+    
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for smtp in idle:
+            await self._close(smtp)
+
+async_smtp_transport = AsyncSMTPTransport(SMTP_SERVER, SMTP_PORT, tls="starttls")
+async_smtp_ssl_transport = AsyncSMTPTransport(SMTP_SERVER, SMTP_SSL_PORT, tls="implicit")
 
 def get_service_duration(service_name: str) -> tuple:
     """Get service duration based on service type - returns (english_duration, german_duration)"""
@@ -264,330 +1142,499 @@ def get_service_duration(service_name: str) -> tuple:
     else:  # KAT VR services
         return ("30 minutes", "30 Minuten")
 
-@run_sync
+# =================== EMAIL TEMPLATES ===================
+#
+# HTML/text bodies live in email_templates/<kind>.<language>.<html|txt> and are split
+# once at startup into static chunks and {{ field }} slots; rendering only joins the
+# cached chunks with the booking values (HTML-escaped unless the field ends in _html).
+
+EMAIL_TEMPLATES_DIR = ROOT_DIR / 'email_templates'
+EMAIL_TEMPLATE_FIELD = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+class EmailTemplate:
+    """Template pre-split into static chunks and field names"""
+    
+    __slots__ = ("static", "fields", "escape_html")
+    
+    def __init__(self, source: str, escape_html: bool = False):
+        parts = EMAIL_TEMPLATE_FIELD.split(source)
+        self.static = parts[0::2]
+        self.fields = parts[1::2]
+        self.escape_html = escape_html
+    
+    def render(self, values: dict) -> str:
+        rendered = [self.static[0]]
+        for field, static in zip(self.fields, self.static[1:]):
+            value = str(values[field])
+            if self.escape_html and not field.endswith("_html"):
+                value = html.escape(value)
+            rendered.append(value)
+            rendered.append(static)
+        return "".join(rendered)
+
+def load_email_templates() -> Dict[tuple, EmailTemplate]:
+    """Parse every template file once, keyed by (kind, language, html|txt)"""
+    templates = {}
+    for path in EMAIL_TEMPLATES_DIR.glob("*.*.*"):
+        kind, language, extension = path.name.split(".")
+        templates[(kind, language, extension)] = EmailTemplate(
+            path.read_text(encoding="utf-8"), escape_html=extension == "html"
+        )
+    return templates
+
+EMAIL_TEMPLATES = load_email_templates()
+
+EMAIL_SUBJECTS = {
+    ("booking_notification", "en"): EmailTemplate("🎮 New VR Booking: {{ name }}"),
+    ("customer_confirmation", "de"): EmailTemplate("🎮 Ihre VR-Session Buchung bestätigt - QNOVA VR"),
+    ("contact_notification", "en"): EmailTemplate("📧 New Contact Message from {{ name }} - QNOVA VR"),
+    ("booking_digest", "en"): EmailTemplate("🎮 {{ count }} New VR Bookings - QNOVA VR"),
+}
+
+# Optional blocks, rendered only when the booking has the field
+SELECTED_GAME_BLOCKS = {
+    "en": EmailTemplate("<p><strong>Selected Game:</strong> 🎮 {{ selectedGame }}</p>", escape_html=True),
+    "de": EmailTemplate("<p><strong>Ausgewähltes Spiel:</strong> 🎮 {{ selectedGame }}</p>", escape_html=True),
+}
+CUSTOMER_MESSAGE_BLOCK = EmailTemplate("""
+        <div style="background: #e3f2fd; padding: 15px; border-radius: 8px; margin: 20px 0;">
+            <h4 style="color: #000; margin-top: 0;">Customer Message:</h4>
+            <p style="font-style: italic;">"{{ message }}"</p>
+        </div>
+""", escape_html=True)
+
+def render_email(kind: str, language: str, values: dict, from_addr: str, to_addr: str) -> MIMEMultipart:
+    """Build a multipart email from the precompiled templates of kind/language"""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = EMAIL_SUBJECTS[(kind, language)].render(values)
+    msg['From'] = from_addr
+    msg['To'] = to_addr
+    
+    text_template = EMAIL_TEMPLATES.get((kind, language, "txt"))
+    if text_template:
+        msg.attach(MIMEText(text_template.render(values), 'plain', 'utf-8'))
+    msg.attach(MIMEText(EMAIL_TEMPLATES[(kind, language, "html")].render(values), 'html', 'utf-8'))
+    return msg
+
+def booking_email_values(booking_data: dict, language: str) -> dict:
+    """Template values for booking emails, including the optional blocks"""
+    english_duration, german_duration = get_service_duration(booking_data['service'])
+    values = {**booking_data, "duration": german_duration if language == "de" else english_duration}
+    values["selected_game_html"] = (
+        SELECTED_GAME_BLOCKS[language].render(booking_data) if booking_data.get('selectedGame') else ''
+    )
+    values["message_html"] = CUSTOMER_MESSAGE_BLOCK.render(booking_data) if booking_data.get('message') else ''
+    values["message_line"] = f"Customer Message: {booking_data['message']}" if booking_data.get('message') else ''
+    return values
+
+# One row per booking in the owner digest
+DIGEST_BOOKING_ROW_HTML = EmailTemplate("""
+        <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin: 15px 0;">
+            <h3 style="color: #000; margin-top: 0;">{{ date }} {{ time }} - {{ service }} ({{ duration }})</h3>
+            {{ selected_game_html }}
+            <p><strong>Customer:</strong> {{ name }} &middot; {{ email }} &middot; {{ phone }}</p>
+            <p><strong>Participants:</strong> {{ participants }} &middot; <strong>Booking ID:</strong> {{ id }}</p>
+            {{ message_html }}
+        </div>
+""", escape_html=True)
+DIGEST_BOOKING_ROW_TEXT = EmailTemplate("""{{ date }} {{ time }} - {{ service }} ({{ duration }})
+  Customer: {{ name }}, {{ email }}, {{ phone }}
+  Participants: {{ participants }} / Booking ID: {{ id }}
+  {{ message_line }}
+""")
+
+def build_booking_notification_message(booking_data: dict) -> MIMEMultipart:
+    """Build the studio owner's new-booking email"""
+    values = booking_email_values(booking_data, "en")
+    return render_email("booking_notification", "en", values, GMAIL_USER, GMAIL_USER)
+
+@run_sync("email")
 def send_booking_notification_email(booking_data: dict):
-    """Send booking notification with multiple fallback methods"""
-    try:
-        # Get service duration
-        english_duration, german_duration = get_service_duration(booking_data['service'])
-        
-        # Try Gmail SMTP first
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"🎮 New VR Booking: {booking_data['name']}"
-        msg['From'] = GMAIL_USER
-        msg['To'] = GMAIL_USER
-        
-        # Create HTML content
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #000; border-bottom: 2px solid #000; padding-bottom: 10px;">
-                    🎮 New VR Session Booking
-                </h2>
-                
-                <div style="background: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="color: #000; margin-top: 0;">Customer Details:</h3>
-                    <p><strong>Name:</strong> {booking_data['name']}</p>
-                    <p><strong>Email:</strong> {booking_data['email']}</p>
-                    <p><strong>Phone:</strong> {booking_data['phone']}</p>
-                </div>
-                
-                <div style="background: #fff; padding: 20px; border: 1px solid #ddd; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="color: #000; margin-top: 0;">Booking Details:</h3>
-                    {f'<p><strong>Selected Game:</strong> 🎮 {booking_data["selectedGame"]}</p>' if booking_data.get('selectedGame') else ''}
-                    <p><strong>Service:</strong> {booking_data['service']} ({english_duration})</p>
-                    <p><strong>Date:</strong> {booking_data['date']}</p>
-                    <p><strong>Time:</strong> {booking_data['time']}</p>
-                    <p><strong>Participants:</strong> {booking_data['participants']}</p>
-                    <p><strong>Booking ID:</strong> {booking_data['id']}</p>
-                    <p><strong>Status:</strong> {booking_data['status']}</p>
-                </div>
-                
-                {f'''
-                <div style="background: #e3f2fd; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                    <h4 style="color: #000; margin-top: 0;">Customer Message:</h4>
-                    <p style="font-style: italic;">"{booking_data['message']}"</p>
-                </div>
-                ''' if booking_data.get('message') else ''}
-                
-                <div style="background: #000; color: #fff; padding: 15px; border-radius: 8px; margin: 20px 0; text-align: center;">
-                    <p style="margin: 0;"><strong>QNOVA VR Studio</strong></p>
-                    <p style="margin: 5px 0;">Stumpfebiel 4, 37073 Göttingen</p>
-                    <p style="margin: 5px 0;">+49 160 96286290</p>
-                </div>
-                
-                <p style="color: #666; font-size: 12px; text-align: center;">
-                    This email was sent automatically when a customer booked a session through your website.
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Create plain text version
-        text_content = f"""
-        🎮 NEW VR SESSION BOOKING
-
-        CUSTOMER DETAILS:
-        Name: {booking_data['name']}
-        Email: {booking_data['email']}
-        Phone: {booking_data['phone']}
-
-        BOOKING DETAILS:
-        Service: {booking_data['service']} ({english_duration})
-        Date: {booking_data['date']}
-        Time: {booking_data['time']}
-        Participants: {booking_data['participants']}
-        Booking ID: {booking_data['id']}
-        Status: {booking_data['status']}
-
-        {f"Customer Message: {booking_data['message']}" if booking_data.get('message') else ''}
-
-        QNOVA VR Studio
-        Stumpfebiel 4, 37073 Göttingen
-        +49 160 96286290
-        """
-        
-        # Attach parts
-        part1 = MIMEText(text_content, 'plain')
-        part2 = MIMEText(html_content, 'html')
-        
-        msg.attach(part1)
-        msg.attach(part2)
-        
-        # Send email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(GMAIL_USER, GMAIL_APP_PASSWORD)
-            server.send_message(msg)
-        
-        logger.info(f"✅ Booking notification email sent successfully to {GMAIL_USER}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"❌ Gmail SMTP failed: {str(e)}")
-        
-        # FALLBACK: Log detailed booking notification for manual checking
-        logger.info("=" * 80)
-        logger.info("🎮 NEW VR BOOKING NOTIFICATION (EMAIL FAILED - CHECK MANUALLY)")
-        logger.info("=" * 80)
-        logger.info(f"📧 NOTIFICATION FOR: {GMAIL_USER}")
-        logger.info(f"👤 CUSTOMER: {booking_data['name']}")
-        logger.info(f"📞 PHONE: {booking_data['phone']}")
-        logger.info(f"📧 EMAIL: {booking_data['email']}")
-        logger.info(f"🎮 SERVICE: {booking_data['service']}")
-        logger.info(f"📅 DATE: {booking_data['date']}")
-        logger.info(f"🕐 TIME: {booking_data['time']}")
-        logger.info(f"👥 PARTICIPANTS: {booking_data['participants']}")
-        logger.info(f"🆔 BOOKING ID: {booking_data['id']}")
-        logger.info(f"📝 STATUS: {booking_data['status']}")
-        if booking_data.get('message'):
-            logger.info(f"💬 MESSAGE: {booking_data['message']}")
-        logger.info("=" * 80)
-        logger.info("⚠️  EMAIL FAILED - BOOKING DETAILS LOGGED ABOVE")
-        logger.info("⚠️  CHECK BACKEND LOGS FOR ALL BOOKING NOTIFICATIONS")
-        logger.info("=" * 80)
-        
-        return False
+    """Send booking notification to the studio owner; SMTP errors propagate to the outbox"""
+    msg = build_booking_notification_message(booking_data)
+    
+    # Send email over a pooled connection
+    smtp_pool.send_message(msg)
+    
+    logger.info(f"✅ Booking notification email sent successfully to {GMAIL_USER}")
+    return True
+
+def build_booking_digest_message(digest: dict) -> MIMEMultipart:
+    """Build the studio owner's summary email for a batch of held booking notifications"""
+    bookings = digest['bookings']
+    rows = [booking_email_values(booking_data, "en") for booking_data in bookings]
+    received = [str(booking_data.get('created_at', ''))[:16].replace('T', ' ') for booking_data in bookings]
+    values = {
+        "count": len(bookings),
+        "first_received": min(received),
+        "last_received": max(received),
+        "bookings_html": "".join(DIGEST_BOOKING_ROW_HTML.render(row) for row in rows),
+        "bookings_text": "\n".join(DIGEST_BOOKING_ROW_TEXT.render(row) for row in rows)
+    }
+    return render_email("booking_digest", "en", values, GMAIL_USER, GMAIL_USER)
+
+@run_sync("email")
+def send_booking_digest_email(digest: dict):
+    """Send one summary email for several bookings; SMTP errors propagate to the outbox"""
+    msg = build_booking_digest_message(digest)
+    
+    # Send email over a pooled connection
+    smtp_pool.send_message(msg)
+    
+    logger.info(f"✅ Booking digest ({len(digest['bookings'])} bookings) sent successfully to {GMAIL_USER}")
+    return True
+
+def build_customer_confirmation_message(booking_data: dict) -> MIMEMultipart:
+    """Build the customer's booking confirmation email in German"""
+    values = booking_email_values(booking_data, "de")
+    return render_email("customer_confirmation", "de", values, GMAIL_USER, booking_data['email'])
 
-@run_sync
+@run_sync("email")
 def send_customer_confirmation_email(booking_data: dict):
-    """Send confirmation email to customer in German"""
-    try:
-        # Get service duration
-        english_duration, german_duration = get_service_duration(booking_data['service'])
-        
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"🎮 Ihre VR-Session Buchung bestätigt - QNOVA VR"
-        msg['From'] = GMAIL_USER
-        msg['To'] = booking_data['email']
-        
-        # Create HTML content in German
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #000; border-bottom: 2px solid #000; padding-bottom: 10px;">
-                    🎮 Buchung bestätigt - QNOVA VR
-                </h2>
-                
-                <p>Liebe/r {booking_data['name']},</p>
-                
-                <p>vielen Dank für Ihre VR-Session Buchung bei QNOVA VR! Ihre Buchung wurde bestätigt.</p>
-                
-                <div style="background: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="color: #000; margin-top: 0;">Ihre Buchungsdetails:</h3>
-                    {f'<p><strong>Ausgewähltes Spiel:</strong> 🎮 {booking_data["selectedGame"]}</p>' if booking_data.get('selectedGame') else ''}
-                    <p><strong>Service:</strong> {booking_data['service']} ({german_duration})</p>
-                    <p><strong>Datum:</strong> {booking_data['date']}</p>
-                    <p><strong>Uhrzeit:</strong> {booking_data['time']}</p>
-                    <p><strong>Teilnehmer:</strong> {booking_data['participants']}</p>
-                    <p><strong>Buchungs-ID:</strong> {booking_data['id']}</p>
-                </div>
-                
-                <div style="background: #fff; padding: 20px; border: 1px solid #ddd; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="color: #000; margin-top: 0;">Besuchen Sie uns:</h3>
-                    <p><strong>Adresse:</strong> Stumpfebiel 4, 37073 Göttingen, Deutschland</p>
-                    <p><strong>Telefon:</strong> +49 160 96286290</p>
-                    <p><strong>E-Mail:</strong> qnovavr.de@gmail.com</p>
-                </div>
-                
-                <div style="background: #e3f2fd; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                    <h4 style="color: #000; margin-top: 0;">Was Sie erwartet:</h4>
-                    <ul>
-                        <li>Kommen Sie 10 Minuten vor Ihrer Session</li>
-                        <li>Bequeme Kleidung empfohlen</li>
-                        <li>Alle VR-Ausrüstung wird gestellt</li>
-                        <li>Expertenbetreuung während der gesamten Session</li>
-                    </ul>
-                </div>
-                
-                <div style="background: #000; color: #fff; padding: 15px; border-radius: 8px; margin: 20px 0; text-align: center;">
-                    <p style="margin: 0;"><strong>QNOVA VR Studio</strong></p>
-                    <p style="margin: 5px 0;">Erleben Sie die Zukunft des Gamings</p>
-                    <p style="margin: 5px 0;">Instagram: @qnova_vr</p>
-                </div>
-                
-                <p>Wir freuen uns darauf, Sie bald zu sehen!</p>
-                
-                <p style="color: #666; font-size: 12px;">
-                    Falls Sie Ihre Buchung ändern oder stornieren möchten, kontaktieren Sie uns bitte so schnell wie möglich.
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Create plain text version in German
-        text_content = f"""
-        🎮 BUCHUNG BESTÄTIGT - QNOVA VR
-
-        Liebe/r {booking_data['name']},
-
-        vielen Dank für Ihre VR-Session Buchung bei QNOVA VR! Ihre Buchung wurde bestätigt.
-
-        IHRE BUCHUNGSDETAILS:
-        Service: {booking_data['service']} ({german_duration})
-        Datum: {booking_data['date']}
-        Uhrzeit: {booking_data['time']}
-        Teilnehmer: {booking_data['participants']}
-        Buchungs-ID: {booking_data['id']}
-
-        BESUCHEN SIE UNS:
-        Adresse: Stumpfebiel 4, 37073 Göttingen, Deutschland
-        Telefon: +49 160 96286290
-        E-Mail: qnovavr.de@gmail.com
-
-        WAS SIE ERWARTET:
-        - Kommen Sie 10 Minuten vor Ihrer Session
-        - Bequeme Kleidung empfohlen
-        - Alle VR-Ausrüstung wird gestellt
-        - Expertenbetreuung während der gesamten Session
-
-        Wir freuen uns darauf, Sie bald zu sehen!
-
-        QNOVA VR Studio
-        Erleben Sie die Zukunft des Gamings
-        Instagram: @qnova_vr
-        """
-        
-        # Attach parts
-        part1 = MIMEText(text_content, 'plain')
-        part2 = MIMEText(html_content, 'html')
-        
-        msg.attach(part1)
-        msg.attach(part2)
-        
-        # Send email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(GMAIL_USER, GMAIL_APP_PASSWORD)
-            server.send_message(msg)
-        
-        logger.info(f"✅ Customer confirmation email sent successfully to {booking_data['email']}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to send customer confirmation email: {str(e)}")
-        return False
+    """Send confirmation email to customer in German; SMTP errors propagate to the outbox"""
+    msg = build_customer_confirmation_message(booking_data)
+    
+    # Send email over a pooled connection
+    smtp_pool.send_message(msg)
+    
+    logger.info(f"✅ Customer confirmation email sent successfully to {booking_data['email']}")
+    return True
+
+def build_contact_notification_message(contact_data: dict) -> MIMEMultipart:
+    """Build the studio owner's contact form email"""
+    values = {
+        **contact_data,
+        # Process message for HTML display
+        "message_html": html.escape(contact_data['message']).replace('\n', '<br>'),
+        "received_at": datetime.now().strftime('%Y-%m-%d at %H:%M')
+    }
+    return render_email("contact_notification", "en", values, GMAIL_USER, GMAIL_USER)  # Send to studio owner
 
-@run_sync
+@run_sync("email")
 def send_contact_notification_email(contact_data):
-    """Send email notification when someone submits contact form"""
-    try:
-        # Create email message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"📧 New Contact Message from {contact_data['name']} - QNOVA VR"
-        msg['From'] = GMAIL_USER
-        msg['To'] = GMAIL_USER  # Send to studio owner
+    """Send email notification when someone submits contact form; SMTP errors propagate to the outbox"""
+    msg = build_contact_notification_message(contact_data)
+    
+    # Send email over a pooled connection
+    smtp_ssl_pool.send_message(msg)
+    
+    logger.info(f"✅ Contact notification email sent successfully for: {contact_data['name']}")
+    return True
+
+# =================== EMAIL OUTBOX ===================
+#
+# Emails are written to the email_outbox collection in the request that creates the
+# booking/message and delivered by a background worker, so a restart or Gmail outage
+# delays notifications instead of losing them.
+
+def email_sender(kind: str):
+    """Email function for an outbox entry kind (looked up at call time)"""
+    if EMAIL_TRANSPORT == "asyncio":
+        return lambda payload: send_email_async(kind, payload)
+    return {
+        "booking_notification": send_booking_notification_email,
+        "customer_confirmation": send_customer_confirmation_email,
+        "contact_notification": send_contact_notification_email,
+        "booking_digest": send_booking_digest_email,
+    }[kind]
+
+async def send_email_async(kind: str, payload: dict) -> bool:
+    """Build an outbox email and send it over the asyncio transport; errors propagate to the outbox"""
+    build, transport = {
+        "booking_notification": (build_booking_notification_message, async_smtp_transport),
+        "customer_confirmation": (build_customer_confirmation_message, async_smtp_transport),
+        "contact_notification": (build_contact_notification_message, async_smtp_ssl_transport),
+        "booking_digest": (build_booking_digest_message, async_smtp_transport),
+    }[kind]
+    msg = build(payload)
+    await transport.send_message(msg)
+    logger.info(f"✅ {kind} email sent successfully to {msg['To']}")
+    return True
+
+outbox_wakeup: Optional[asyncio.Event] = None  # created on startup, on the serving loop
+
+def log_undelivered_email(kind: str, payload: dict):
+    """FALLBACK: log a dead-lettered email's details once so it can be handled manually"""
+    logger.info("=" * 80)
+    logger.info(f"📧 {kind.upper()} EMAIL UNDELIVERABLE - CHECK MANUALLY")
+    logger.info("=" * 80)
+    if kind == "booking_digest":
+        for booking_data in payload['bookings']:
+            logger.info(f"🎮 {booking_data['date']} {booking_data['time']} {booking_data['service']} - "
+                        f"{booking_data['name']} ({booking_data['email']}, {booking_data['phone']}) id={booking_data['id']}")
+    elif kind == "contact_notification":
+        logger.info(f"👤 FROM: {payload['name']} <{payload['email']}>")
+        logger.info(f"📝 SUBJECT: {payload['subject']}")
+        logger.info(f"💬 MESSAGE: {payload['message']}")
+    else:
+        if kind == "booking_notification":
+            logger.info(f"📧 NOTIFICATION FOR: {GMAIL_USER}")
+        logger.info(f"👤 CUSTOMER: {payload['name']}")
+        logger.info(f"📞 PHONE: {payload['phone']}")
+        logger.info(f"📧 EMAIL: {payload['email']}")
+        logger.info(f"🎮 SERVICE: {payload['service']}")
+        logger.info(f"📅 DATE: {payload['date']}")
+        logger.info(f"🕐 TIME: {payload['time']}")
+        logger.info(f"👥 PARTICIPANTS: {payload['participants']}")
+        logger.info(f"🆔 BOOKING ID: {payload['id']}")
+        if payload.get('message'):
+            logger.info(f"💬 MESSAGE: {payload['message']}")
+    logger.info("=" * 80)
+
+def outbox_entry(kind: str, payload: dict, now: datetime) -> dict:
+    # Owner booking notifications wait as "held" until flush_owner_digest folds them into one email
+    held = OWNER_DIGEST_ENABLED and kind == "booking_notification"
+    return {
+        "id": str(uuid.uuid4()),
+        "kind": kind,
+        "payload": payload,
+        "status": "held" if held else "pending",  # pending -> sending -> sent, or dead after EMAIL_OUTBOX_MAX_ATTEMPTS; held -> digesting -> digested
+        "attempts": 0,
+        "next_attempt_at": now,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now
+    }
 
-        # Process message for HTML display
-        message_html = contact_data['message'].replace('\n', '<br>')
-        
-        # HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>New Contact Message</title>
-        </head>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="background: #000; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0;">
-                    <h1 style="margin: 0; font-size: 24px;">📧 New Contact Message</h1>
-                    <p style="margin: 5px 0 0 0; opacity: 0.9;">QNOVA Virtual Reality Studio</p>
-                </div>
-                
-                <div style="background: #f9f9f9; padding: 20px; border-radius: 0 0 8px 8px; border: 1px solid #ddd;">
-                    <h2 style="color: #000; margin-top: 0;">Contact Details:</h2>
-                    <div style="background: #fff; padding: 20px; border: 1px solid #ddd; border-radius: 8px; margin: 20px 0;">
-                        <p><strong>Name:</strong> {contact_data['name']}</p>
-                        <p><strong>Email:</strong> <a href="mailto:{contact_data['email']}">{contact_data['email']}</a></p>
-                        <p><strong>Subject:</strong> {contact_data['subject']}</p>
-                        <p><strong>Message:</strong></p>
-                        <div style="background: #f8f9fa; padding: 15px; border-radius: 5px; border-left: 4px solid #000;">
-                            {message_html}
-                        </div>
-                    </div>
-                    
-                    <div style="background: #e8f4f8; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                        <h3 style="color: #000; margin-top: 0;">Next Steps:</h3>
-                        <p style="margin: 5px 0;">• Reply to customer at: <a href="mailto:{contact_data['email']}">{contact_data['email']}</a></p>
-                        <p style="margin: 5px 0;">• Response time target: Within 24 hours</p>
-                        <p style="margin: 5px 0;">• Message received: {datetime.now().strftime('%Y-%m-%d at %H:%M')}</p>
-                    </div>
-                    
-                    <hr style="margin: 30px 0; border: none; border-top: 1px solid #ddd;">
-                    <div style="text-align: center; color: #666; font-size: 14px;">
-                        <p style="margin: 0;">QNOVA Virtual Reality Studio</p>
-                        <p style="margin: 5px 0;">Stumpfebiel 4, 37073 Göttingen</p>
-                        <p style="margin: 5px 0;">📞 +49 160 96286290 | 📧 qnovavr.de@gmail.com</p>
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Attach HTML body
-        html_part = MIMEText(html_body, 'html', 'utf-8')
-        msg.attach(html_part)
-
-        # Send email
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(GMAIL_USER, GMAIL_APP_PASSWORD)
-            server.send_message(msg)
-        
-        print(f"Contact notification email sent successfully for: {contact_data['name']}")
-        return True
+class NotificationStage:
+    """Post-commit notification stage shared by all write endpoints.
+    
+    Endpoints call after_commit() once their DB write succeeded; the notifications are
+    persisted to the outbox and handed to the worker, and the HTTP response goes out
+    without waiting for SMTP. Counters cover the process lifetime; queue depth is read
+    from the outbox so it includes work left over from previous runs.
+    """
+    
+    def __init__(self):
+        self.enqueued = 0
+        self.sent = 0
+        self.failed_attempts = 0
+        self.dead_lettered = 0
+        self.enqueue_failures = 0
+        self.digests = 0
+        self.digested_bookings = 0
+        self.deferred = 0
+    
+    async def after_commit(self, *emails: tuple):
+        """Store (kind, payload) emails in the outbox and wake the worker"""
+        now = datetime.utcnow()
+        try:
+            await db.email_outbox.insert_many([outbox_entry(kind, payload, now) for kind, payload in emails])
+        except Exception as e:
+            # The write itself already succeeded - don't fail the request over its notifications
+            self.enqueue_failures += len(emails)
+            logger.error(f"❌ Failed to queue {len(emails)} notification(s): {str(e)}")
+            for kind, payload in emails:
+                logger.info(f"📧 UNQUEUED {kind}: {payload}")
+            return
+        self.enqueued += len(emails)
+        if outbox_wakeup is not None:
+            outbox_wakeup.set()
+    
+    def record(self, status: str):
+        if status == "sent":
+            self.sent += 1
+        else:
+            self.failed_attempts += 1
+            if status == "dead":
+                self.dead_lettered += 1
+    
+    async def stats(self) -> Dict:
+        depth = {"pending": 0, "sending": 0, "dead": 0, "held": 0}
+        async for group in db.email_outbox.aggregate([
+            {"$match": {"status": {"$in": list(depth)}}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]):
+            depth[group["_id"]] = group["count"]
+        return {
+            "queue_depth": depth["pending"],
+            "in_flight": depth["sending"],
+            "dead_letters": depth["dead"],
+            "held_for_digest": depth["held"],
+            "digest": {
+                "enabled": OWNER_DIGEST_ENABLED,
+                "window_seconds": OWNER_DIGEST_WINDOW_SECONDS,
+                "max_bookings": OWNER_DIGEST_MAX_BOOKINGS,
+                "digests": self.digests,
+                "digested_bookings": self.digested_bookings
+            },
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "dead_lettered": self.dead_lettered,
+            "enqueue_failures": self.enqueue_failures,
+            "deferred_by_circuit": self.deferred,
+            "smtp_circuit": smtp_circuit.stats()
+        }
 
-    except Exception as e:
-        print(f"Failed to send contact notification email: {str(e)}")
-        return False
+notifications = NotificationStage()
+
+def outbox_backoff_seconds(attempts: int) -> float:
+    return min(EMAIL_OUTBOX_BASE_BACKOFF_SECONDS * 2 ** (attempts - 1), EMAIL_OUTBOX_MAX_BACKOFF_SECONDS)
+
+async def claim_outbox_batch() -> List[dict]:
+    """Lease up to EMAIL_OUTBOX_BATCH_SIZE due entries to this worker"""
+    now = datetime.utcnow()
+    due = {"$or": [
+        {"status": "pending", "next_attempt_at": {"$lte": now}},
+        {"status": "sending", "locked_until": {"$lt": now}}
+    ]}
+    candidates = await db.email_outbox.find(due, {"_id": 0, "id": 1}) \
+        .sort("next_attempt_at", ASCENDING) \
+        .limit(EMAIL_OUTBOX_BATCH_SIZE) \
+        .to_list(EMAIL_OUTBOX_BATCH_SIZE)
+    if not candidates:
+        return []
+    
+    # Re-check the due condition so entries leased by another worker in between are skipped
+    lock_id = str(uuid.uuid4())
+    await db.email_outbox.update_many(
+        {"id": {"$in": [entry["id"] for entry in candidates]}, **due},
+        {"$set": {
+            "status": "sending",
+            "lock_id": lock_id,
+            "locked_until": now + timedelta(seconds=EMAIL_OUTBOX_LEASE_SECONDS),
+            "updated_at": now
+        }}
+    )
+    return await db.email_outbox.find({"lock_id": lock_id, "status": "sending"}, {"_id": 0}) \
+        .to_list(EMAIL_OUTBOX_BATCH_SIZE)
+
+def defer_outbox_entry(entry: dict, now: datetime) -> UpdateOne:
+    """Push an entry past the SMTP breaker's reset window without spending an attempt"""
+    notifications.deferred += 1
+    metrics.email_outcome(entry["kind"], "deferred")
+    return UpdateOne({"id": entry["id"], "lock_id": entry["lock_id"]}, {"$set": {
+        "status": "pending",
+        "last_error": f"smtp circuit {smtp_circuit.state}: {smtp_circuit.last_error}",
+        "next_attempt_at": now + timedelta(seconds=max(smtp_circuit.retry_after(), EMAIL_OUTBOX_POLL_SECONDS)),
+        "updated_at": now,
+        "lock_id": None,
+        "locked_until": None
+    }})
+
+async def deliver_outbox_entry(entry: dict, semaphore: asyncio.Semaphore) -> UpdateOne:
+    """Send one entry and return the status update to record for it"""
+    if smtp_circuit.retry_after() > 0:
+        # Degraded mode: don't tie up an email thread on a server the breaker gave up on
+        return defer_outbox_entry(entry, datetime.utcnow())
+    
+    async with semaphore:
+        try:
+            sent = await email_sender(entry["kind"])(entry["payload"])
+            error, rejected = None if sent else "send returned False", False
+        except Exception as e:
+            sent, error, rejected = False, f"{type(e).__name__}: {e}", smtp_rejects_message(e)
+    
+    now = datetime.utcnow()
+    if not sent and not rejected and smtp_circuit.state != "closed":
+        # Gmail is down rather than this email being bad - keep it without counting the attempt
+        return defer_outbox_entry(entry, now)
+    
+    attempts = entry.get("attempts", 0) + 1
+    if sent:
+        update = {"status": "sent", "sent_at": now}
+    elif attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+        update = {"status": "dead", "last_error": error}
+        logger.error(f"❌ Email {entry['kind']} {entry['id']} dead-lettered after {attempts} attempts: {error}")
+        log_undelivered_email(entry["kind"], entry["payload"])
+    else:
+        logger.warning(f"⚠️ Email {entry['kind']} {entry['id']} attempt {attempts} failed: {error}")
+        update = {
+            "status": "pending",
+            "last_error": error,
+            "next_attempt_at": now + timedelta(seconds=outbox_backoff_seconds(attempts))
+        }
+    update.update({"attempts": attempts, "updated_at": now, "lock_id": None, "locked_until": None})
+    notifications.record(update["status"])
+    metrics.email_outcome(entry["kind"], "retry" if update["status"] == "pending" else update["status"])
+    return UpdateOne({"id": entry["id"], "lock_id": entry["lock_id"]}, {"$set": update})
+
+async def process_email_outbox_batch() -> int:
+    """Deliver one leased batch; returns the number of entries handled"""
+    entries = await claim_outbox_batch()
+    if not entries:
+        return 0
+    
+    semaphore = asyncio.Semaphore(EMAIL_OUTBOX_CONCURRENCY)
+    updates = await asyncio.gather(*[deliver_outbox_entry(entry, semaphore) for entry in entries])
+    await db.email_outbox.bulk_write(list(updates), ordered=False)
+    return len(entries)
+
+async def flush_owner_digest() -> int:
+    """Fold held booking notifications into one booking_digest entry once the oldest has
+    waited OWNER_DIGEST_WINDOW_SECONDS or OWNER_DIGEST_MAX_BOOKINGS are waiting.
+    
+    Runs even with digest mode off so entries held before a config change still go out.
+    Returns the number of bookings folded into the digest.
+    """
+    now = datetime.utcnow()
+    held = {"$or": [
+        {"status": "held"},
+        {"status": "digesting", "locked_until": {"$lt": now}}
+    ]}
+    candidates = await db.email_outbox.find(held, {"_id": 0, "id": 1, "next_attempt_at": 1}) \
+        .sort("next_attempt_at", ASCENDING) \
+        .limit(OWNER_DIGEST_MAX_BOOKINGS) \
+        .to_list(OWNER_DIGEST_MAX_BOOKINGS)
+    if not candidates:
+        return 0
+    window_open = candidates[0]["next_attempt_at"] > now - timedelta(seconds=OWNER_DIGEST_WINDOW_SECONDS)
+    if OWNER_DIGEST_ENABLED and window_open and len(candidates) < OWNER_DIGEST_MAX_BOOKINGS:
+        return 0
+    
+    # Lease the held entries first so two workers never build a digest from the same bookings
+    lock_id = str(uuid.uuid4())
+    await db.email_outbox.update_many(
+        {"id": {"$in": [entry["id"] for entry in candidates]}, **held},
+        {"$set": {
+            "status": "digesting",
+            "lock_id": lock_id,
+            "locked_until": now + timedelta(seconds=EMAIL_OUTBOX_LEASE_SECONDS),
+            "updated_at": now
+        }}
+    )
+    entries = await db.email_outbox.find({"lock_id": lock_id, "status": "digesting"}, {"_id": 0}) \
+        .sort("next_attempt_at", ASCENDING) \
+        .to_list(OWNER_DIGEST_MAX_BOOKINGS)
+    if not entries:
+        return 0
+    
+    digest = outbox_entry("booking_digest", {"bookings": [entry["payload"] for entry in entries]}, now)
+    await db.email_outbox.insert_one(digest)
+    await db.email_outbox.update_many(
+        {"lock_id": lock_id},
+        {"$set": {
+            "status": "digested",
+            "digest_id": digest["id"],
+            "lock_id": None,
+            "locked_until": None,
+            "updated_at": now
+        }}
+    )
+    notifications.digests += 1
+    notifications.digested_bookings += len(entries)
+    logger.info(f"📨 Folded {len(entries)} booking notification(s) into digest {digest['id']}")
+    return len(entries)
+
+async def run_email_outbox_worker():
+    """Drain the outbox until cancelled, sleeping until woken or the poll interval passes"""
+    while True:
+        try:
+            await flush_owner_digest()
+            handled = await process_email_outbox_batch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Email outbox worker error: {str(e)}")
+            handled = 0
+        
+        if handled < EMAIL_OUTBOX_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(outbox_wakeup.wait(), timeout=EMAIL_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            outbox_wakeup.clear()
 
 # Sample games data with authentic game covers and functional booking
 SAMPLE_GAMES = [
@@ -712,6 +1759,315 @@ SAMPLE_GAMES = [
     }
 ]
 
+# =================== GAMES CATALOG ===================
+
+GAMES_CACHE_CONTROL = "public, max-age=300"
+
+def encode_games(games: List[dict]) -> tuple:
+    """Pre-encoded JSON body and strong ETag for a list of games"""
+    body = json.dumps(
+        [Game(**game).dict() for game in games], separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def build_games_catalog(games: List[dict]) -> Dict[str, tuple]:
+    """Encode the full catalog and each platform's subset once; keys are lowercased platforms, "" for all"""
+    catalog = {"": encode_games(games)}
+    for platform in {game["platform"].lower() for game in games}:
+        catalog[platform] = encode_games([game for game in games if game["platform"].lower() == platform])
+    catalog["<empty>"] = encode_games([])
+    return catalog
+
+def refresh_games_catalog():
+    """Rebuild the pre-encoded /games responses - call after changing SAMPLE_GAMES"""
+    global games_catalog
+    games_catalog = build_games_catalog(SAMPLE_GAMES)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+# =================== AVAILABILITY CACHE ===================
+
+class AvailabilityCache:
+    """In-process TTL + LRU cache of /availability responses keyed by (date, service).
+    
+    Every write path touching bookings or slots calls invalidate() for the affected dates.
+    invalidate()/clear() also bump a per-date generation: a lookup captures it before
+    reading Mongo, and set() drops the result if a write invalidated the date meanwhile.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (date, service) -> (expires_at, value)
+        self._generations = {}  # date -> invalidation count
+        self._epoch = 0  # bumped by clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+    
+    @staticmethod
+    def _key(date: str, service: Optional[str]) -> tuple:
+        return (date, service or "all")
+    
+    def get(self, date: str, service: Optional[str]):
+        key = self._key(date, service)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def generation(self, date: str) -> tuple:
+        return (self._epoch, self._generations.get(date, 0))
+    
+    def set(self, date: str, service: Optional[str], value, generation: tuple):
+        """Cache value unless the date was invalidated since generation was taken"""
+        if generation != self.generation(date):
+            self.stale_sets += 1
+            return
+        key = self._key(date, service)
+        self._entries[key] = (monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, *dates: str):
+        """Drop every cached service for the given dates"""
+        dates = set(dates)
+        for date in dates:
+            self._generations[date] = self._generations.get(date, 0) + 1
+        for key in [key for key in self._entries if key[0] in dates]:
+            del self._entries[key]
+            self.invalidations += 1
+    
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._generations.clear()
+        self._epoch += 1
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale_sets": self.stale_sets
+        }
+
+availability_cache = AvailabilityCache(AVAILABILITY_CACHE_TTL_SECONDS, AVAILABILITY_CACHE_MAX_ENTRIES)
+
+# =================== AVAILABILITY ENGINE ===================
+#
+# A (date, service) day is stored as integer bitmasks over minute-of-day positions
+# (bit N = HH:MM with HH*60+MM == N), so membership, counting and "next free" lookups
+# are bit operations on a fixed-width (1440 bit) value.
+
+MINUTES_PER_DAY = 24 * 60
+
+def minute_of_day(time_str: str) -> Optional[int]:
+    """Bit position of an HH:MM time, or None if it isn't a valid time"""
+    try:
+        hours, minutes = time_str.split(":")
+        position = int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+    if 0 <= int(minutes) < 60 and 0 <= position < MINUTES_PER_DAY:
+        return position
+    return None
+
+def format_minute(position: int) -> str:
+    return f"{position // 60:02d}:{position % 60:02d}"
+
+def mask_for_times(times) -> int:
+    mask = 0
+    for time_str in times:
+        position = minute_of_day(time_str)
+        if position is not None:
+            mask |= 1 << position
+    return mask
+
+def iter_positions(mask: int):
+    """Yield set bit positions in ascending order"""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+def count_bits(mask: int) -> int:
+    return bin(mask).count("1")
+
+# Bookable session starts per service (PlayStation hourly, KAT VR every 30 minutes)
+PLAYSTATION_START_MASK = mask_for_times(f"{hour:02d}:00" for hour in range(12, 22))
+KAT_VR_START_MASK = mask_for_times(
+    [f"{hour:02d}:00" for hour in range(12, 22)] + [f"{hour:02d}:30" for hour in range(12, 21)]
+)
+
+def service_start_mask(service: Optional[str]) -> int:
+    if service and 'playstation' in service.lower():
+        return PLAYSTATION_START_MASK
+    return KAT_VR_START_MASK
+
+class DayAvailability:
+    """Availability of one (date, service) as offered/free/booked bitmasks"""
+    
+    __slots__ = ("date", "service", "offered", "free", "booked")
+    
+    def __init__(self, date: str, service: Optional[str], offered: int, free: int, booked: int):
+        self.date = date
+        self.service = service
+        self.offered = offered
+        self.free = free & offered
+        self.booked = booked & offered
+    
+    @classmethod
+    def from_bookings(cls, date: str, service: Optional[str], booked_times) -> "DayAvailability":
+        """Service schedule minus booked start times"""
+        offered = service_start_mask(service)
+        booked = mask_for_times(booked_times) & offered
+        return cls(date, service, offered, offered & ~booked, booked)
+    
+    @classmethod
+    def from_slots(cls, date: str, service: Optional[str], slots: List[dict]) -> "DayAvailability":
+        """Availability of stored time_slots documents of a single service"""
+        offered = free = booked = 0
+        for slot in slots:
+            position = minute_of_day(slot["time"])
+            if position is None:
+                continue
+            bit = 1 << position
+            offered |= bit
+            if slot["status"] == SlotStatus.available:
+                free |= bit
+            elif slot["status"] == SlotStatus.booked:
+                booked |= bit
+        return cls(date, service, offered, free, booked)
+    
+    def is_free(self, time_str: str) -> bool:
+        position = minute_of_day(time_str)
+        return position is not None and bool(self.free >> position & 1)
+    
+    def count_offered(self) -> int:
+        return count_bits(self.offered)
+    
+    def count_free(self) -> int:
+        return count_bits(self.free)
+    
+    def count_booked(self) -> int:
+        return count_bits(self.booked)
+    
+    def first_free_at_or_after(self, time_str: str = "00:00") -> Optional[str]:
+        position = minute_of_day(time_str)
+        if position is None:
+            return None
+        candidates = self.free >> position << position
+        if not candidates:
+            return None
+        return format_minute((candidates & -candidates).bit_length() - 1)
+    
+    def offered_times(self) -> List[str]:
+        return [format_minute(position) for position in iter_positions(self.offered)]
+    
+    def free_times(self) -> List[str]:
+        return [format_minute(position) for position in iter_positions(self.free)]
+
+def slot_availability_by_service(date: str, slots: List[dict]) -> Dict[str, DayAvailability]:
+    """Group a day's slot documents per service into DayAvailability bitmaps"""
+    slots_by_service = {}
+    for slot in slots:
+        slots_by_service.setdefault(slot["service_type"], []).append(slot)
+    return {
+        service: DayAvailability.from_slots(date, service, service_slots)
+        for service, service_slots in slots_by_service.items()
+    }
+
+# =================== PAGINATION ===================
+#
+# Admin lists are paged by keyset on (sort_field, id): the cursor encodes the last
+# document's values, so each page is an index range scan instead of a growing skip.
+
+def encode_page_cursor(document: dict, sort_field: str) -> str:
+    payload = {"v": document[sort_field].isoformat(), "id": document["id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def keyset_filter(sort_field: str, cursor: Optional[str]) -> dict:
+    """Mongo filter for documents after the cursor position"""
+    if not cursor:
+        return {}
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value = datetime.fromisoformat(payload["v"])
+        last_id = payload["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {sort_field: {"$gt": value}},
+        {sort_field: value, "id": {"$gt": last_id}}
+    ]}
+
+async def fetch_page(collection, sort_field: str, limit: int, cursor: Optional[str]) -> tuple:
+    """One page of documents plus the cursor of the next page (None on the last page)"""
+    documents = await collection.find(keyset_filter(sort_field, cursor), {"_id": 0}) \
+        .sort([(sort_field, ASCENDING), ("id", ASCENDING)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+    
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_page_cursor(documents[-1], sort_field)
+    return documents, next_cursor
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def stream_ndjson(collection, sort_field: str, cursor: Optional[str], limit: Optional[int]) -> StreamingResponse:
+    """Stream documents as newline-delimited JSON while the Motor cursor produces them"""
+    query_filter = keyset_filter(sort_field, cursor)
+    
+    async def generate():
+        documents = collection.find(query_filter, {"_id": 0}) \
+            .sort([(sort_field, ASCENDING), ("id", ASCENDING)]) \
+            .batch_size(NDJSON_BATCH_SIZE)
+        if limit:
+            documents = documents.limit(limit)
+        async for document in documents:
+            yield json.dumps(document, default=json_default, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+async def paginated_list(collection, model, sort_field: str, response: Response,
+                         limit: Optional[int], cursor: Optional[str], format: str):
+    """Shared body of the admin list endpoints: a JSON page with X-Next-Cursor, or an NDJSON stream"""
+    if format == "ndjson":
+        return stream_ndjson(collection, sort_field, cursor, limit)
+    
+    documents, next_cursor = await fetch_page(collection, sort_field, limit or DEFAULT_PAGE_SIZE, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [model(**document) for document in documents]
+
+games_catalog = build_games_catalog(SAMPLE_GAMES)
+
 # Routes
 @api_router.get("/")
 async def root():
@@ -725,99 +2081,117 @@ async def create_status_check(input: StatusCheckCreate):
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
+    return await paginated_list(db.status_checks, StatusCheck, "timestamp", response, limit, cursor, format)
 
 @api_router.post("/bookings", response_model=Booking)
-async def create_booking(booking_data: BookingCreate, background_tasks: BackgroundTasks):
+async def create_booking(booking_data: BookingCreate):
     booking_obj = Booking(**booking_data.dict())
     
     # Save to MongoDB
     await db.bookings.insert_one(booking_obj.dict())
+    availability_cache.invalidate(booking_obj.date)
     
-    # Send notification email to studio owner in background
-    background_tasks.add_task(send_booking_notification_email, booking_obj.dict())
-    
-    # Send confirmation email to customer in background
-    background_tasks.add_task(send_customer_confirmation_email, booking_obj.dict())
+    # Queue notification to studio owner and confirmation to customer
+    await notifications.after_commit(
+        ("booking_notification", booking_obj.dict()),
+        ("customer_confirmation", booking_obj.dict())
+    )
     
     return booking_obj
 
 @api_router.get("/bookings", response_model=List[Booking])
-async def get_bookings():
-    bookings = await db.bookings.find().to_list(1000)
-    return [Booking(**booking) for booking in bookings]
+async def get_bookings(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
+    return await paginated_list(db.bookings, Booking, "created_at", response, limit, cursor, format)
 
 @api_router.get("/games", response_model=List[Game])
-async def get_games(platform: Optional[str] = None):
-    games = SAMPLE_GAMES
-    if platform:
-        games = [game for game in games if game["platform"].lower() == platform.lower()]
-    return [Game(**game) for game in games]
+async def get_games(request: Request, platform: Optional[str] = None):
+    key = platform.lower() if platform else ""
+    body, etag = games_catalog.get(key, games_catalog["<empty>"])
+    headers = {"ETag": etag, "Cache-Control": GAMES_CACHE_CONTROL}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @api_router.post("/contact", response_model=ContactMessage)
 async def create_contact_message(message_data: ContactMessageCreate):
     message_obj = ContactMessage(**message_data.dict())
     await db.contact_messages.insert_one(message_obj.dict())
     
-    # Send email notification to studio owner
-    try:
-        await send_contact_notification_email(message_obj.dict())
-    except Exception as e:
-        print(f"Failed to send contact notification email: {str(e)}")
+    # Queue email notification to studio owner
+    await notifications.after_commit(("contact_notification", message_obj.dict()))
     
     return message_obj
 
 # =================== CALENDAR SYSTEM ENDPOINTS ===================
 
+# Only the fields a CalendarDay response needs - skips _id and anything else stored on slots
+TIME_SLOT_PROJECTION = {"_id": 0, **{field: 1 for field in TimeSlot.model_fields}}
+
+def build_calendar_day(date: str, slots: List[dict]) -> dict:
+    """Sort a day's raw slot documents by time and count statuses from the availability bitmaps"""
+    slots.sort(key=lambda s: s["time"])
+    services = slot_availability_by_service(date, slots).values()
+    
+    return {
+        "date": date,
+        "slots": slots,
+        "total_slots": sum(day.count_offered() for day in services),
+        "available_slots": sum(day.count_free() for day in services),
+        "booked_slots": sum(day.count_booked() for day in services)
+    }
+
 @api_router.get("/calendar/{date}", response_model=CalendarDay)
 async def get_calendar_day(date: str):
     """Get all time slots for a specific date (YYYY-MM-DD format)"""
     try:
         # Get all slots for the date
-        slots_cursor = db.time_slots.find({"date": date})
-        slots = []
-        async for slot in slots_cursor:
-            slots.append(TimeSlot(**slot))
-        
-        # Sort slots by time
-        slots.sort(key=lambda x: x.time)
+        slots = await db.time_slots.find({"date": date}, TIME_SLOT_PROJECTION).to_list(None)
         
         # Generate missing slots if needed
         if not slots:
-            slots = await generate_default_slots_for_date(date)
-        
-        # Calculate statistics
-        total_slots = len(slots)
-        available_slots = len([s for s in slots if s.status == SlotStatus.available])
-        booked_slots = len([s for s in slots if s.status == SlotStatus.booked])
+            await generate_default_slots_for_date(date)
+            slots = await db.time_slots.find({"date": date}, TIME_SLOT_PROJECTION).to_list(None)
         
-        return CalendarDay(
-            date=date,
-            slots=slots,
-            total_slots=total_slots,
-            available_slots=available_slots,
-            booked_slots=booked_slots
-        )
+        return build_calendar_day(date, slots)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @api_router.get("/calendar/range/{start_date}/{end_date}")
 async def get_calendar_range(start_date: str, end_date: str):
-    """Get calendar data for a date range"""
+    """Get calendar data for a date range with a single time_slots query"""
     try:
-        # Parse dates
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
+        dates = date_range(start_date, end_date)
+        if not dates:
+            return {"days": [], "start_date": start_date, "end_date": end_date}
+        
+        # Fetch the whole range at once (YYYY-MM-DD strings sort chronologically)
+        slots_by_date = {date_str: [] for date_str in dates}
+        slots_cursor = db.time_slots.find({"date": {"$gte": dates[0], "$lte": dates[-1]}}, TIME_SLOT_PROJECTION)
+        async for slot in slots_cursor:
+            if slot.get("date") in slots_by_date:
+                slots_by_date[slot["date"]].append(slot)
+        
+        # Generate all days without slots in one batch
+        missing_dates = [date_str for date_str, slots in slots_by_date.items() if not slots]
+        if missing_dates:
+            await generate_default_slots_for_dates(missing_dates)
+            # Re-read: a concurrent request may have generated (and booked) some of them first
+            async for slot in db.time_slots.find({"date": {"$in": missing_dates}}, TIME_SLOT_PROJECTION):
+                slots_by_date[slot["date"]].append(slot)
         
-        days = []
-        current = start
-        while current <= end:
-            date_str = current.strftime("%Y-%m-%d")
-            day_data = await get_calendar_day(date_str)
-            days.append(day_data)
-            current += timedelta(days=1)
+        days = [build_calendar_day(date_str, slots_by_date[date_str]) for date_str in dates]
         
         return {"days": days, "start_date": start_date, "end_date": end_date}
     except Exception as e:
@@ -828,8 +2202,14 @@ async def create_time_slot(slot_data: TimeSlotCreate):
     """Create a new time slot"""
     try:
         slot = TimeSlot(**slot_data.dict())
-        await db.time_slots.insert_one(slot.dict())
+        try:
+            await db.time_slots.insert_one(slot.dict())
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Time slot already exists")
+        availability_cache.invalidate(slot.date)
         return slot
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -850,6 +2230,7 @@ async def update_time_slot(slot_id: str, slot_update: TimeSlotUpdate):
         
         # Get updated slot
         updated_slot = await db.time_slots.find_one({"id": slot_id})
+        availability_cache.invalidate(updated_slot["date"])
         return TimeSlot(**updated_slot)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -858,69 +2239,98 @@ async def update_time_slot(slot_id: str, slot_update: TimeSlotUpdate):
 async def delete_time_slot(slot_id: str):
     """Delete a time slot"""
     try:
-        result = await db.time_slots.delete_one({"id": slot_id})
-        if result.deleted_count == 0:
+        deleted_slot = await db.time_slots.find_one_and_delete({"id": slot_id}, projection={"_id": 0, "date": 1})
+        if not deleted_slot:
             raise HTTPException(status_code=404, detail="Time slot not found")
+        availability_cache.invalidate(deleted_slot["date"])
         return {"message": "Time slot deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@api_router.post("/calendar/book-slot/{slot_id}")
-async def book_time_slot(slot_id: str, booking_info: dict):
-    """Book a specific time slot"""
-    try:
-        # Check if slot exists and is available
-        slot = await db.time_slots.find_one({"id": slot_id})
-        if not slot:
+async def claim_time_slot(slot_id: str, booking_info: dict) -> dict:
+    """Atomically book an available slot and create its booking.
+    
+    The slot is claimed with one conditional find_one_and_update (available -> booked),
+    so of any number of concurrent requests exactly one wins; the booking document is
+    only written once the claim succeeded.
+    """
+    booking_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    
+    slot = await db.time_slots.find_one_and_update(
+        {"id": slot_id, "status": SlotStatus.available},
+        {
+            "$set": {
+                "status": SlotStatus.booked,
+                "booking_id": booking_id,
+                "customer_info": {
+                    "name": booking_info["name"],
+                    "email": booking_info["email"],
+                    "phone": booking_info.get("phone", "")
+                },
+                "updated_at": now
+            }
+        },
+        projection={"_id": 0, "date": 1, "time": 1, "service_type": 1}
+    )
+    
+    if not slot:
+        # Only the losing path pays for a second lookup to tell 404 from 400
+        if not await db.time_slots.find_one({"id": slot_id}, {"_id": 1}):
             raise HTTPException(status_code=404, detail="Time slot not found")
-        
-        if slot["status"] != SlotStatus.available:
-            raise HTTPException(status_code=400, detail="Time slot is not available")
-        
-        # Create booking
-        booking_data = {
-            "id": str(uuid.uuid4()),
-            "name": booking_info["name"],
-            "email": booking_info["email"],
-            "phone": booking_info.get("phone", ""),
-            "service": slot["service_type"],
-            "date": slot["date"],
-            "time": slot["time"],
-            "participants": booking_info.get("participants", 1),
-            "message": booking_info.get("message", ""),
-            "selectedGame": booking_info.get("selectedGame", ""),
-            "status": "confirmed",
-            "created_at": datetime.utcnow()
-        }
-        
-        # Save booking
+        raise HTTPException(status_code=400, detail="Time slot is not available")
+    
+    booking_data = {
+        "id": booking_id,
+        "name": booking_info["name"],
+        "email": booking_info["email"],
+        "phone": booking_info.get("phone", ""),
+        "service": slot["service_type"],
+        "date": slot["date"],
+        "time": slot["time"],
+        "participants": booking_info.get("participants", 1),
+        "message": booking_info.get("message", ""),
+        "selectedGame": booking_info.get("selectedGame", ""),
+        "status": "confirmed",
+        "created_at": now
+    }
+    
+    try:
         await db.bookings.insert_one(booking_data)
-        
-        # Update slot status
+        availability_cache.invalidate(slot["date"])
+    except Exception:
+        # Release the claim so the slot doesn't stay booked without a booking
         await db.time_slots.update_one(
-            {"id": slot_id},
+            {"id": slot_id, "booking_id": booking_id},
             {
                 "$set": {
-                    "status": SlotStatus.booked,
-                    "booking_id": booking_data["id"],
-                    "customer_info": {
-                        "name": booking_info["name"],
-                        "email": booking_info["email"],
-                        "phone": booking_info.get("phone", "")
-                    },
+                    "status": SlotStatus.available,
+                    "booking_id": None,
+                    "customer_info": None,
                     "updated_at": datetime.utcnow()
                 }
             }
         )
+        raise
+    
+    booking_data.pop("_id", None)
+    return booking_data
+
+@api_router.post("/calendar/book-slot/{slot_id}")
+async def book_time_slot(slot_id: str, booking_info: dict):
+    """Book a specific time slot"""
+    try:
+        booking_data = await claim_time_slot(slot_id, booking_info)
         
-        # Send email notifications
-        try:
-            await send_booking_notification_email(booking_data)
-            await send_customer_confirmation_email(booking_data)
-        except Exception as e:
-            print(f"Email notification failed: {str(e)}")
+        # Queue email notifications
+        await notifications.after_commit(
+            ("booking_notification", booking_data),
+            ("customer_confirmation", booking_data)
+        )
         
         return {"message": "Time slot booked successfully", "booking_id": booking_data["id"]}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -928,8 +2338,20 @@ async def book_time_slot(slot_id: str, booking_info: dict):
 async def generate_slots_for_date(date: str):
     """Generate default time slots for a specific date"""
     try:
-        slots = await generate_default_slots_for_date(date)
-        return {"message": f"Generated {len(slots)} slots for {date}", "slots": slots}
+        inserted = await generate_default_slots_for_date(date)
+        availability_cache.invalidate(date)
+        slots = await db.time_slots.find({"date": date}, TIME_SLOT_PROJECTION).sort("time", ASCENDING).to_list(None)
+        return {"message": f"Generated {inserted} slots for {date}", "slots": slots}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.post("/calendar/generate-slots/range/{start_date}/{end_date}")
+async def generate_slots_for_range(start_date: str, end_date: str):
+    """Pre-generate default time slots for every empty date in a range"""
+    try:
+        result = await generate_default_slots_for_range(start_date, end_date)
+        availability_cache.invalidate(*date_range(start_date, end_date))
+        return {"message": f"Generated {result['generated_slots']} slots for {start_date} to {end_date}", **result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -960,7 +2382,7 @@ async def create_test_bookings():
             date = (today + timedelta(days=i % 3)).strftime("%Y-%m-%d")
             time = f"{12 + i}:{'00' if i % 2 == 0 else '30'}"
             
-            # Create time slot if doesn't exist
+            # Create time slot if doesn't exist, otherwise mark the existing one as booked
             slot = TimeSlot(
                 date=date,
                 time=time,
@@ -973,9 +2395,19 @@ async def create_test_bookings():
                     "phone": f"+49 123 45678{i}"
                 }
             )
-            await db.time_slots.insert_one(slot.dict())
+            slot_data = slot.dict()
+            await db.time_slots.update_one(
+                {"date": slot.date, "time": slot.time, "service_type": slot.service_type},
+                {
+                    "$set": {k: v for k, v in slot_data.items() if k not in ("id", "created_at")},
+                    "$setOnInsert": {"id": slot_data["id"], "created_at": slot_data["created_at"]}
+                },
+                upsert=True
+            )
             test_bookings.append(slot)
         
+        availability_cache.invalidate(*[slot.date for slot in test_bookings])
+        
         return {"message": "Test bookings created", "bookings": len(test_bookings)}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -990,6 +2422,9 @@ async def clear_test_data():
         # Remove test bookings  
         result2 = await db.bookings.delete_many({"name": {"$regex": "^Test Customer"}})
         
+        # Test data can sit on any date
+        availability_cache.clear()
+        
         return {
             "message": "Test data cleared",
             "deleted_slots": result1.deleted_count,
@@ -998,87 +2433,424 @@ async def clear_test_data():
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+async def fetch_booked_times(start_date: str, end_date: str) -> Dict[str, List[str]]:
+    """Booked start times per date for a whole date range, from one aggregated bookings query"""
+    pipeline = [
+        {"$match": {"date": {"$gte": start_date, "$lte": end_date}}},
+        {"$group": {"_id": "$date", "times": {"$addToSet": "$time"}}}
+    ]
+    booked_times = {}
+    async for day in db.bookings.aggregate(pipeline):
+        booked_times[day["_id"]] = [time_str for time_str in day["times"] if time_str]
+    return booked_times
+
+def day_availability_summary(day: DayAvailability, include_slots: bool = False) -> dict:
+    summary = {
+        "date": day.date,
+        "total_slots": day.count_offered(),
+        "available_count": day.count_free(),
+        "booked_count": day.count_booked(),
+        "fully_booked": day.count_free() == 0
+    }
+    if include_slots:
+        summary["slots"] = [
+            {"time": time_slot, "available": day.is_free(time_slot),
+             "status": "available" if day.is_free(time_slot) else "booked"}
+            for time_slot in day.offered_times()
+        ]
+    return summary
+
+@api_router.get("/availability/range/{start_date}/{end_date}")
+async def check_availability_range(
+    start_date: str,
+    end_date: str,
+    service: Optional[str] = None,
+    include_slots: bool = False
+):
+    """Per-day free/booked counts (optionally per-slot availability) for a range of dates"""
+    try:
+        dates = date_range(start_date, end_date)
+        if not dates:
+            raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+        if len(dates) > MAX_AVAILABILITY_RANGE_DAYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Date range is limited to {MAX_AVAILABILITY_RANGE_DAYS} days"
+            )
+        
+        booked_times = await fetch_booked_times(dates[0], dates[-1])
+        days = [
+            day_availability_summary(
+                DayAvailability.from_bookings(date, service, booked_times.get(date, [])),
+                include_slots
+            )
+            for date in dates
+        ]
+        
+        return {
+            "start_date": dates[0],
+            "end_date": dates[-1],
+            "service": service or "all",
+            "days": days
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Registered before /availability/{date} so "next" isn't taken for a date
+@api_router.get("/availability/next")
+async def find_next_available_slots(
+    service: Optional[str] = None,
+    participants: int = Query(1, ge=1, le=MAX_PARTICIPANTS),
+    start_date: Optional[str] = None,
+    start_time: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    horizon_days: int = Query(30, ge=1, le=MAX_SEARCH_HORIZON_DAYS)
+):
+    """Find the next free slots for a service from a starting date/time across a horizon of days.
+    
+    Without start_date the search starts now, so start_time defaults to the current time
+    (slots earlier today have passed); with an explicit start_date it defaults to 00:00.
+    """
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else datetime.now()
+        if start_time is None:
+            start_time = "00:00" if start_date else start.strftime("%H:%M")
+        dates = [(start + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(horizon_days)]
+        if minute_of_day(start_time) is None:
+            raise HTTPException(status_code=400, detail="start_time must be HH:MM")
+        
+        booked_times = await fetch_booked_times(dates[0], dates[-1])
+        
+        slots = []
+        for index, date in enumerate(dates):
+            day = DayAvailability.from_bookings(date, service, booked_times.get(date, []))
+            # Only the first day is cut off at start_time
+            next_time = day.first_free_at_or_after(start_time if index == 0 else "00:00")
+            while next_time is not None and len(slots) < limit:
+                slots.append({"date": date, "time": next_time})
+                next_time = day.first_free_at_or_after(format_minute(minute_of_day(next_time) + 1))
+            if len(slots) >= limit:
+                break
+        
+        return {
+            "service": service or "all",
+            "participants": participants,
+            "start_date": dates[0],
+            "start_time": start_time,
+            "horizon_days": horizon_days,
+            "slots": slots,
+            "count": len(slots)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @api_router.get("/availability/{date}")
 async def check_availability(date: str, service: Optional[str] = None):
     """Check availability for a specific date and optionally filter by service type"""
     try:
-        # Generate time slots based on service type
-        if service and service.lower().find('playstation') != -1:
-            # PlayStation sessions: 1-hour intervals from 12:00-22:00
-            time_slots = []
-            for hour in range(12, 22):
-                time_slots.append(f"{hour:02d}:00")
-        else:
-            # KAT VR sessions: 30-minute intervals from 12:00-21:30
-            time_slots = []
-            for hour in range(12, 22):
-                time_slots.append(f"{hour:02d}:00")
-                if hour < 21:
-                    time_slots.append(f"{hour:02d}:30")
+        cached = availability_cache.get(date, service)
+        if cached is not None:
+            return cached
+        generation = availability_cache.generation(date)
         
         # Check existing bookings for this date
-        bookings_cursor = db.bookings.find({"date": date})
-        booked_times = []
-        async for booking in bookings_cursor:
-            booked_times.append(booking.get("time", ""))
+        bookings_cursor = db.bookings.find({"date": date}, {"_id": 0, "time": 1})
+        booked_times = [booking.get("time", "") async for booking in bookings_cursor]
+        day = DayAvailability.from_bookings(date, service, booked_times)
         
         # Create availability response
         available_slots = []
-        for time_slot in time_slots:
-            is_available = time_slot not in booked_times
+        for time_slot in day.offered_times():
+            is_available = day.is_free(time_slot)
             available_slots.append({
                 "time": time_slot,
                 "available": is_available,
                 "status": "available" if is_available else "booked"
             })
         
-        return {
+        availability = {
             "date": date,
             "service": service or "all",
             "slots": available_slots,
-            "total_slots": len(available_slots),
-            "available_count": len([s for s in available_slots if s["available"]]),
-            "booked_count": len([s for s in available_slots if not s["available"]])
+            "total_slots": day.count_offered(),
+            "available_count": day.count_free(),
+            "booked_count": day.count_booked()
         }
+        availability_cache.set(date, service, availability, generation)
+        return availability
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-async def generate_default_slots_for_date(date: str) -> List[TimeSlot]:
-    """Generate default time slots for a specific date"""
-    slots = []
+@api_router.get("/admin/notifications")
+async def get_notification_stats():
+    """Outbox queue depth and delivery/failure counters of the notification stage"""
+    return await notifications.stats()
+
+@api_router.post("/admin/email-outbox/{entry_id}/retry")
+async def retry_outbox_entry(entry_id: str):
+    """Put a dead-lettered email back into the outbox for another round of attempts"""
+    result = await db.email_outbox.update_one(
+        {"id": entry_id, "status": "dead"},
+        {"$set": {"status": "pending", "attempts": 0, "next_attempt_at": datetime.utcnow(),
+                  "updated_at": datetime.utcnow()}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Dead-lettered email not found")
+    if outbox_wakeup is not None:
+        outbox_wakeup.set()
+    return {"message": "Email re-queued", "id": entry_id}
+
+@api_router.get("/admin/executors")
+async def get_executor_stats():
+    """Active/queued/rejected counters of the blocking-work thread pools"""
+    return {name: executor.stats() for name, executor in EXECUTORS.items()}
+
+@api_router.get("/admin/event-loop")
+async def get_event_loop_stats():
+    """Event-loop lag, stall count and the stack captured during the last stall"""
+    return loop_monitor.stats()
+
+@api_router.get("/admin/availability-cache")
+async def get_availability_cache_stats():
+    """Hit/miss counters of the in-process availability cache"""
+    return availability_cache.stats()
+
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(limit: int = Query(50, ge=1, le=MONGO_MAX_QUERY_SHAPES)):
+    """Recent MongoDB commands over MONGO_SLOW_COMMAND_MS and per-query-shape totals"""
+    return slow_command_log.report(limit)
+
+@api_router.delete("/admin/slow-queries")
+async def reset_slow_queries():
+    """Start a fresh measurement window"""
+    slow_command_log.reset()
+    return {"message": "Slow query log cleared"}
+
+# =================== PROFILING ===================
+#
+# In-place profiling of the running app. CPU profiles either run cProfile on the event
+# loop thread (pstats, for snakeviz/pstats) or sample the stacks of every thread
+# (collapsed stacks, for flamegraph.pl/speedscope - this includes the email threads).
+# tracemalloc snapshots are diffed against the baseline taken when tracing started.
+
+cpu_profile_running = False
+memory_baseline: Optional[tracemalloc.Snapshot] = None
+
+def check_profiling_token(token: Optional[str]):
+    if not PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (PROFILING_TOKEN not set)")
+    if not token or not hmac.compare_digest(token, PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def profile_download(content, filename: str, media_type: str) -> Response:
+    return Response(content, media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+def profile_filename(kind: str, extension: str) -> str:
+    return f"qnova-{kind}-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.{extension}"
+
+@run_sync("blocking")
+def sample_thread_stacks(seconds: float, interval: float) -> Dict[str, int]:
+    """Sample every other thread's stack; returns collapsed stack -> sample count"""
+    sampler = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    samples = {}
+    deadline = monotonic() + seconds
+    while monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            collapsed = ";".join(reversed(stack))
+            samples[collapsed] = samples.get(collapsed, 0) + 1
+        sleep(interval)
+    return samples
+
+@run_sync("blocking")
+def take_memory_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+def format_memory_statistics(stats: list, title: str, limit: int, group_by: str) -> str:
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [title, f"traced: {current / 1024 / 1024:.1f} MiB (peak {peak / 1024 / 1024:.1f} MiB)", ""]
+    for stat in stats[:limit]:
+        lines.append(str(stat))
+        if group_by == "traceback":
+            lines.extend(f"    {line}" for line in stat.traceback.format())
+    return "\n".join(lines) + "\n"
+
+@api_router.get("/admin/profile/cpu")
+async def profile_cpu(
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+    format: str = Query("pstats", pattern="^(pstats|collapsed)$"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Profile the live app for `seconds` and download the result"""
+    global cpu_profile_running
+    check_profiling_token(x_admin_token)
+    if cpu_profile_running:
+        raise HTTPException(status_code=409, detail="A CPU profile is already running")
     
-    # Define default time slots (9 AM to 9 PM, 30-minute intervals)
-    start_hour = 9
-    end_hour = 21
+    cpu_profile_running = True
+    try:
+        if format == "collapsed":
+            samples = await sample_thread_stacks(seconds, PROFILE_SAMPLE_INTERVAL_SECONDS)
+            body = "".join(f"{stack} {count}\n" for stack, count in sorted(samples.items()))
+            return profile_download(body, profile_filename("cpu", "collapsed.txt"), "text/plain; charset=utf-8")
+        
+        # cProfile hooks the current thread only - this handler runs on the event loop,
+        # so every request served meanwhile is profiled
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        profiler.create_stats()
+        return profile_download(marshal.dumps(profiler.stats), profile_filename("cpu", "pstats"),
+                                "application/octet-stream")
+    finally:
+        cpu_profile_running = False
+
+@api_router.post("/admin/profile/memory/start")
+async def start_memory_tracing(frames: int = Query(10, ge=1, le=50), x_admin_token: Optional[str] = Header(None)):
+    """Start tracemalloc and take the baseline snapshot later diffs are compared against"""
+    global memory_baseline
+    check_profiling_token(x_admin_token)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    memory_baseline = await take_memory_snapshot()
+    return {"message": "Memory tracing started", "frames": tracemalloc.get_traceback_limit()}
+
+@api_router.get("/admin/profile/memory/snapshot")
+async def download_memory_snapshot(
+    compare: bool = True,
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    format: str = Query("text", pattern="^(text|raw)$"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Top allocations (or growth since the baseline) as a text report, or the raw snapshot
+    for tracemalloc.Snapshot.load()"""
+    check_profiling_token(x_admin_token)
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="Memory tracing is not running - POST /admin/profile/memory/start first")
     
-    for hour in range(start_hour, end_hour):
-        for minute in [0, 30]:
-            time_str = f"{hour:02d}:{minute:02d}"
-            
-            # Create KAT VR slot
-            kat_slot = TimeSlot(
-                date=date,
-                time=time_str,
-                service_type="KAT VR Gaming Session",
-                status=SlotStatus.available
-            )
-            slots.append(kat_slot)
-            
-            # Create PlayStation slot (1-hour sessions, so only on the hour)
-            if minute == 0:
-                ps_slot = TimeSlot(
-                    date=date,
-                    time=time_str,
-                    service_type="PlayStation 5 VR Experience",
-                    status=SlotStatus.available
-                )
-                slots.append(ps_slot)
-    
-    # Save slots to database
-    for slot in slots:
-        await db.time_slots.insert_one(slot.dict())
+    snapshot = await take_memory_snapshot()
+    if format == "raw":
+        return profile_download(pickle.dumps(snapshot), profile_filename("memory", "tracemalloc"),
+                                "application/octet-stream")
     
-    return slots
+    if compare and memory_baseline is not None:
+        stats = snapshot.compare_to(memory_baseline, group_by)
+        title = f"tracemalloc diff against baseline, top {limit} by {group_by}"
+    else:
+        stats = snapshot.statistics(group_by)
+        title = f"tracemalloc snapshot, top {limit} by {group_by}"
+    report = format_memory_statistics(stats, title, limit, group_by)
+    return profile_download(report, profile_filename("memory", "txt"), "text/plain; charset=utf-8")
+
+@api_router.post("/admin/profile/memory/stop")
+async def stop_memory_tracing(x_admin_token: Optional[str] = Header(None)):
+    """Stop tracemalloc and drop the baseline (tracing costs memory and CPU while on)"""
+    global memory_baseline
+    check_profiling_token(x_admin_token)
+    tracemalloc.stop()
+    memory_baseline = None
+    return {"message": "Memory tracing stopped"}
+
+# =================== DATABASE INDEXES ===================
+
+# Indexes backing the hot query paths, declared per collection
+INDEX_SPECS = {
+    "time_slots": [
+        IndexModel([("date", ASCENDING), ("service_type", ASCENDING), ("time", ASCENDING)],
+                   name="date_service_time"),
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+    ],
+    "bookings": [
+        IndexModel([("date", ASCENDING), ("time", ASCENDING)], name="date_time"),
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "contact_messages": [
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "status_checks": [
+        IndexModel([("timestamp", ASCENDING), ("id", ASCENDING)], name="timestamp_id"),
+    ],
+    "email_outbox": [
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt"),
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("lock_id", ASCENDING)], name="lock_id"),
+    ],
+    "payment_transactions": [
+        IndexModel([("session_id", ASCENDING)], unique=True, name="session_id_unique"),
+        IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+    ],
+}
+
+# Deterministic slot key - keeps concurrent slot generation from duplicating slots. Built in
+# its own call after legacy duplicates are removed: a failed unique build fails every index
+# in the same create_indexes call, and time_slots must not be left unindexed because of it.
+SLOT_KEY_INDEX = IndexModel([("date", ASCENDING), ("time", ASCENDING), ("service_type", ASCENDING)],
+                            unique=True, name="slot_key_unique")
+SLOT_KEY_INDEX_STATUS = "time_slots.slot_key_unique"
+
+# Build status per collection (and for the slot key index): pending, building, ready or failed
+index_status = {
+    collection: {"state": "pending", "indexes": [index.document["name"] for index in indexes]}
+    for collection, indexes in INDEX_SPECS.items()
+}
+index_status[SLOT_KEY_INDEX_STATUS] = {"state": "pending", "indexes": [SLOT_KEY_INDEX.document["name"]]}
+
+async def build_indexes(status_key: str, collection: str, indexes: List[IndexModel], prepare=None):
+    """Create indexes that don't exist yet (create_indexes is a no-op for existing ones)"""
+    index_status[status_key]["state"] = "building"
+    started = datetime.utcnow()
+    try:
+        if prepare:
+            await prepare()
+        await db[collection].create_indexes(indexes)
+        index_status[status_key].update({
+            "state": "ready",
+            "build_seconds": round((datetime.utcnow() - started).total_seconds(), 3)
+        })
+        logger.info(f"✅ Indexes ready on {status_key}")
+    except Exception as e:
+        index_status[status_key].update({"state": "failed", "error": str(e)})
+        logger.error(f"❌ Failed to create indexes on {status_key}: {str(e)}")
+
+async def ensure_indexes():
+    """Create every declared index, then the unique slot key once duplicates are gone"""
+    for collection, indexes in INDEX_SPECS.items():
+        await build_indexes(collection, collection, indexes)
+    await build_indexes(SLOT_KEY_INDEX_STATUS, "time_slots", [SLOT_KEY_INDEX], prepare=remove_duplicate_slots)
+
+def index_bootstrap_summary() -> Dict:
+    """Overall index state for the health endpoint"""
+    states = {status["state"] for status in index_status.values()}
+    if "failed" in states:
+        overall = "failed"
+    elif states == {"ready"}:
+        overall = "ready"
+    else:
+        overall = "building"
+    return {"state": overall, "collections": index_status}
 
 @api_router.get("/health")
 async def health_check():
@@ -1093,7 +2865,9 @@ async def health_check():
             "timestamp": datetime.now().isoformat(),
             "database": "connected",
             "version": "1.0.0",
-            "database_status": "ok"
+            "database_status": "ok",
+            "indexes": index_bootstrap_summary(),
+            "email": {"smtp_circuit": smtp_circuit.stats()}
         }
     except Exception as e:
         return {
@@ -1102,16 +2876,22 @@ async def health_check():
             "timestamp": datetime.now().isoformat(),
             "database": "disconnected",
             "error": str(e),
-            "version": "1.0.0"
+            "version": "1.0.0",
+            "indexes": index_bootstrap_summary(),
+            "email": {"smtp_circuit": smtp_circuit.stats()}
         }
 
 @api_router.get("/contact", response_model=List[ContactMessage])
-async def get_contact_messages():
-    messages = await db.contact_messages.find().to_list(1000)
-    return [ContactMessage(**message) for message in messages]
-
-async def generate_default_slots_for_date(date: str) -> List[TimeSlot]:
-    """Generate default time slots for a specific date"""
+async def get_contact_messages(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
+    return await paginated_list(db.contact_messages, ContactMessage, "created_at", response, limit, cursor, format)
+
+def build_default_slots(date: str) -> List[TimeSlot]:
+    """Build (without saving) the default time slots for a specific date"""
     slots = []
     
     # Define default time slots (12:00 to 22:00, following existing pattern)
@@ -1123,28 +2903,140 @@ async def generate_default_slots_for_date(date: str) -> List[TimeSlot]:
             time_str = f"{hour:02d}:{minute:02d}"
             
             # Create KAT VR slot (30-minute sessions)
-            kat_slot = TimeSlot(
+            slots.append(TimeSlot(
                 date=date,
                 time=time_str,
                 service_type="KAT VR Gaming Session",
                 status=SlotStatus.available
-            )
-            slots.append(kat_slot)
-            await db.time_slots.insert_one(kat_slot.dict())
+            ))
             
         # Create PlayStation slot for each hour (1-hour sessions)
         hour_time_str = f"{hour:02d}:00"
-        ps_slot = TimeSlot(
+        slots.append(TimeSlot(
             date=date,
             time=hour_time_str,
             service_type="PlayStation 5 VR Experience",
             status=SlotStatus.available
-        )
-        slots.append(ps_slot)
-        await db.time_slots.insert_one(ps_slot.dict())
+        ))
     
     return slots
 
+def date_range(start_date: str, end_date: str) -> List[str]:
+    """List every YYYY-MM-DD date from start_date to end_date inclusive"""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    
+    dates = []
+    current = start
+    while current <= end:
+        dates.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+    return dates
+
+async def upsert_slots(slots: List[TimeSlot]) -> int:
+    """Insert slots that don't exist yet; slots already present (by slot key) are left untouched.
+    Returns the number of slots actually inserted.
+    """
+    operations = [
+        UpdateOne(
+            {"date": slot.date, "time": slot.time, "service_type": slot.service_type},
+            {"$setOnInsert": slot.dict()},
+            upsert=True
+        )
+        for slot in slots
+    ]
+    try:
+        result = await db.time_slots.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # A concurrent generator inserted the same slot first - that's the outcome we want
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        return e.details.get("nUpserted", 0)
+    return result.upserted_count
+
+async def remove_duplicate_slots() -> int:
+    """Delete legacy duplicate slots so the unique slot key index can be built.
+    
+    Per (date, time, service_type) the slot to keep is a non-available (booked, blocked, ...)
+    one, else the one whose id is the deterministic slot key, else the oldest. Groups with
+    more than one non-available slot are double bookings: they're logged and left alone.
+    Returns the number of slots deleted.
+    """
+    if SLOT_KEY_INDEX.document["name"] in await db.time_slots.index_information():
+        # Unique index already built - duplicates can't exist, skip the full-collection $group
+        return 0
+    duplicates = db.time_slots.aggregate([
+        {"$group": {
+            "_id": {"date": "$date", "time": "$time", "service_type": "$service_type"},
+            "slots": {"$push": {"_id": "$_id", "id": "$id", "status": "$status",
+                                "booking_id": "$booking_id", "created_at": "$created_at"}},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+    
+    removed = 0
+    async for group in duplicates:
+        key = group["_id"]
+        slots = group["slots"]
+        taken = [slot for slot in slots if slot.get("status") != SlotStatus.available]
+        if len(taken) > 1:
+            logger.error(f"❌ Double-booked slot {key}: bookings {[slot.get('booking_id') for slot in taken]} "
+                         f"- resolve manually, the unique slot index can't be built until then")
+            continue
+        canonical = slot_key(key["date"], key["time"], key["service_type"])
+        keep = taken[0] if taken else min(
+            slots, key=lambda slot: (slot.get("id") != canonical, slot.get("created_at") or datetime.min)
+        )
+        result = await db.time_slots.delete_many(
+            {"_id": {"$in": [slot["_id"] for slot in slots if slot["_id"] != keep["_id"]]}}
+        )
+        removed += result.deleted_count
+    
+    if removed:
+        logger.info(f"🧹 Removed {removed} duplicate time slot(s)")
+    return removed
+
+async def generate_default_slots_for_dates(dates: List[str]) -> int:
+    """Generate default time slots for several dates, one bulk upsert per batch of days.
+    
+    Returns the number of slots inserted - slots that already existed are left as stored,
+    so callers re-read the dates to get the real slots.
+    """
+    inserted = 0
+    for i in range(0, len(dates), SLOT_GENERATION_BATCH_DAYS):
+        batch = []
+        for date in dates[i:i + SLOT_GENERATION_BATCH_DAYS]:
+            batch.extend(build_default_slots(date))
+        
+        if batch:
+            inserted += await upsert_slots(batch)
+    
+    return inserted
+
+async def generate_default_slots_for_date(date: str) -> int:
+    """Generate default time slots for a specific date"""
+    return await generate_default_slots_for_dates([date])
+
+async def generate_default_slots_for_range(start_date: str, end_date: str) -> Dict:
+    """Pre-generate default slots for every date in a range that has none yet"""
+    dates = date_range(start_date, end_date)
+    existing_dates = set()
+    if dates:
+        existing_dates = set(await db.time_slots.distinct(
+            "date", {"date": {"$gte": dates[0], "$lte": dates[-1]}}
+        ))
+    
+    missing_dates = [date for date in dates if date not in existing_dates]
+    inserted = await generate_default_slots_for_dates(missing_dates)
+    
+    return {
+        "requested_days": len(dates),
+        "generated_days": len(missing_dates),
+        "skipped_days": len(dates) - len(missing_dates),
+        "generated_slots": inserted
+    }
+
 # =================== PAYMENT ENDPOINTS (TEMPORARILY DISABLED) ===================
 # 
 # # Initialize Stripe Checkout (will be initialized in endpoints)
@@ -1354,6 +3246,11 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "QNOVA VR API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1361,10 +3258,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_index_bootstrap():
+    """Build indexes in the background so startup isn't blocked on large collections"""
+    app.state.index_bootstrap_task = asyncio.create_task(ensure_indexes())
+
+@app.on_event("startup")
+async def start_email_outbox_worker():
+    global outbox_wakeup
+    outbox_wakeup = asyncio.Event()
+    app.state.email_outbox_task = asyncio.create_task(run_email_outbox_worker())
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_event_loop_monitor():
+    loop_monitor.stop()
+
+@app.on_event("shutdown")
+async def stop_email_outbox_worker():
+    task = getattr(app.state, "email_outbox_task", None)
+    if task:
+        task.cancel()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
 
+@app.on_event("shutdown")
+async def close_smtp_pools():
+    # QUIT is a blocking network round trip per pooled connection - keep it off the event loop
+    await asyncio.gather(EXECUTORS["email"].run(smtp_pool.close), EXECUTORS["email"].run(smtp_ssl_pool.close))
+    await async_smtp_transport.close()
+    await async_smtp_ssl_transport.close()
+    for executor in EXECUTORS.values():
+        executor.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
     # Railway provides PORT env var, fallback to 8001 for local development
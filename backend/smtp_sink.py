@@ -0,0 +1,137 @@
+"""
+Minimal in-process SMTP sink for tests and benchmarks.
+
+Accepts every message over plain SMTP (no TLS) and keeps it in memory:
+
+    async with SMTPSink() as sink:
+        transport = AsyncSMTPTransport(sink.host, sink.port, tls="none", username=None)
+        await transport.send_message(msg)
+        await sink.wait_for(1)
+        print(sink.messages[0]["Subject"])
+"""
+
+import asyncio
+import email
+from email.message import Message
+from typing import List, Optional, Set
+
+
+class SMTPSink:
+    """Asyncio SMTP server that accepts and stores every message it receives"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port  # 0 picks a free port on start()
+        self.messages: List[Message] = []
+        self.envelopes: List[dict] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()  # open client connections
+        self._received: Optional[asyncio.Condition] = None  # created on start(), on the running loop
+
+    async def start(self):
+        self._received = asyncio.Condition()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop accepting connections and drop the ones still open (e.g. pooled clients)"""
+        if self._server:
+            self._server.close()
+            writers = list(self._writers)
+            for writer in writers:
+                writer.close()
+            await asyncio.gather(*(writer.wait_closed() for writer in writers), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def wait_for(self, count: int, timeout: float = 5.0):
+        """Wait until at least count messages have been received"""
+        async with self._received:
+            await asyncio.wait_for(self._received.wait_for(lambda: len(self.messages) >= count), timeout)
+
+    async def _store(self, mail_from: str, rcpt_tos: List[str], data: bytes):
+        async with self._received:
+            self.messages.append(email.message_from_bytes(data))
+            self.envelopes.append({"mail_from": mail_from, "rcpt_tos": rcpt_tos})
+            self._received.notify_all()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+
+        self._writers.add(writer)
+        mail_from, rcpt_tos = None, []
+        reply("220 qnova-smtp-sink ready")
+        try:
+            while True:
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode("utf-8", "replace").strip().partition(" ")
+                command = command.upper()
+
+                if command == "EHLO":
+                    reply("250-qnova-smtp-sink")
+                    reply("250-AUTH PLAIN LOGIN")
+                    reply("250-8BITMIME")
+                    reply("250 SMTPUTF8")
+                elif command == "HELO":
+                    reply("250 qnova-smtp-sink")
+                elif command == "AUTH":
+                    # Accept any credentials; LOGIN needs two more lines from the client
+                    if argument.upper().startswith("LOGIN"):
+                        reply("334 VXNlcm5hbWU6")
+                        await writer.drain()
+                        await reader.readline()
+                        reply("334 UGFzc3dvcmQ6")
+                        await writer.drain()
+                        await reader.readline()
+                    elif argument.upper() == "PLAIN":
+                        reply("334 ")
+                        await writer.drain()
+                        await reader.readline()
+                    reply("235 Authentication successful")
+                elif command == "MAIL":
+                    mail_from, rcpt_tos = argument.partition(":")[2].strip(), []
+                    reply("250 OK")
+                elif command == "RCPT":
+                    rcpt_tos.append(argument.partition(":")[2].strip())
+                    reply("250 OK")
+                elif command == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    data = bytearray()
+                    while True:
+                        data_line = await reader.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        # Undo dot-stuffing
+                        data += data_line[1:] if data_line.startswith(b"..") else data_line
+                    await self._store(mail_from, rcpt_tos, bytes(data))
+                    mail_from, rcpt_tos = None, []
+                    reply("250 OK: queued")
+                elif command == "RSET":
+                    mail_from, rcpt_tos = None, []
+                    reply("250 OK")
+                elif command == "NOOP":
+                    reply("250 OK")
+                elif command == "QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client went away, or the loop is shutting down with the connection still open
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
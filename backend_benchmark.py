@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+QNOVA VR Backend Benchmark Suite
+Runs the FastAPI app in-process (httpx ASGI transport, no network) and drives every
+public route at a fixed concurrency, reporting p50/p95/p99 latency and throughput.
+
+MongoDB: a local server (--mongo-url, default $MONGO_URL or mongodb://localhost:27017)
+using a throwaway qnova_vr_bench_* database, or --in-memory (needs mongomock-motor).
+Email: delivered by the outbox worker into an in-process SMTP sink, never to Gmail.
+
+Usage:
+    python backend_benchmark.py --requests 500 --concurrency 50
+    python backend_benchmark.py --scenarios games,calendar_day --compare benchmark-results-<previous>.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import perf_counter
+
+BACKEND_DIR = Path(__file__).resolve().parent / "backend"
+BENCH_DATE_OFFSET_DAYS = 60  # far enough ahead that bench slots never collide with "today"
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+
+
+def print_header(title):
+    print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*78}{Colors.ENDC}")
+    print(f"{Colors.BLUE}{Colors.BOLD}{title}{Colors.ENDC}")
+    print(f"{Colors.BLUE}{Colors.BOLD}{'='*78}{Colors.ENDC}")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+class BenchContext:
+    """Dates and slot ids shared by the scenarios"""
+
+    def __init__(self, days):
+        start = datetime.now() + timedelta(days=BENCH_DATE_OFFSET_DAYS)
+        self.dates = [(start + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days)]
+        self.slot_ids = []
+
+    def date(self, i):
+        return self.dates[i % len(self.dates)]
+
+    def week(self, i):
+        first = i % max(1, len(self.dates) - 6)
+        return self.dates[first], self.dates[min(first + 6, len(self.dates) - 1)]
+
+
+def booking_body(ctx, i):
+    return {
+        "name": f"Bench Customer {i}",
+        "email": f"bench{i}@example.com",
+        "phone": "+49 551 000000",
+        "service": "KAT VR Gaming Session" if i % 2 else "PlayStation 5 VR Experience",
+        "date": ctx.date(i),
+        "time": f"{12 + i % 10}:00",
+        "participants": 1 + i % 4,
+        "message": "Benchmark booking",
+        "selectedGame": "Beat Saber"
+    }
+
+
+# name -> request(ctx, i) returning (method, path, json body or None)
+SCENARIOS = {
+    "games": lambda ctx, i: ("GET", "/api/games", None),
+    "availability": lambda ctx, i: ("GET", f"/api/availability/{ctx.date(i)}", None),
+    "availability_range": lambda ctx, i: ("GET", "/api/availability/range/{}/{}".format(*ctx.week(i)), None),
+    "availability_next": lambda ctx, i: ("GET", f"/api/availability/next?start_date={ctx.date(i)}&limit=5", None),
+    "calendar_day": lambda ctx, i: ("GET", f"/api/calendar/{ctx.date(i)}", None),
+    "calendar_range": lambda ctx, i: ("GET", "/api/calendar/range/{}/{}".format(*ctx.week(i)), None),
+    "bookings_create": lambda ctx, i: ("POST", "/api/bookings", booking_body(ctx, i)),
+    "bookings_list": lambda ctx, i: ("GET", "/api/bookings?limit=100", None),
+    "book_slot": lambda ctx, i: ("POST", f"/api/calendar/book-slot/{ctx.slot_ids[i]}", {
+        "name": f"Bench Slot {i}",
+        "email": f"slot{i}@example.com",
+        "phone": "+49 551 000000",
+        "participants": 2
+    }),
+    "contact": lambda ctx, i: ("POST", "/api/contact", {
+        "name": f"Bench Contact {i}",
+        "email": f"contact{i}@example.com",
+        "subject": "Benchmark",
+        "message": "Hello from the benchmark suite.\nSecond line."
+    }),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="In-process benchmark of the QNOVA VR API")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per scenario before measuring")
+    parser.add_argument("--days", type=int, default=14, help="days of calendar slots to generate")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated subset to run")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MongoDB")
+    parser.add_argument("--keep-db", action="store_true", help="don't drop the benchmark database afterwards")
+    parser.add_argument("--email-transport", choices=("threaded", "asyncio"), default="threaded")
+    parser.add_argument("--output", help="results file (default benchmark-results-<timestamp>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="keep the server's INFO logging")
+    return parser.parse_args()
+
+
+def load_server(args, db_name):
+    """Import server.py against the benchmark database"""
+    # Must be set before import - server.py builds its client and SMTP settings at import time,
+    # and load_dotenv() never overrides variables that are already set
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = db_name
+    os.environ["GMAIL_APP_PASSWORD"] = "benchmark"  # the sink accepts any login
+    sys.path.insert(0, str(BACKEND_DIR))
+    import server
+
+    if args.in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--in-memory needs mongomock-motor (pip install mongomock-motor)")
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[db_name]
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    return server
+
+
+def use_smtp_sink(server, sink, transport):
+    """Point every email path at the in-process sink"""
+    server.EMAIL_TRANSPORT = transport
+    server.smtp_pool = server.SMTPConnectionPool(sink.host, sink.port, starttls=False)
+    server.smtp_ssl_pool = server.SMTPConnectionPool(sink.host, sink.port, starttls=False)
+    server.async_smtp_transport = server.AsyncSMTPTransport(sink.host, sink.port, tls="none", username=None)
+    server.async_smtp_ssl_transport = server.AsyncSMTPTransport(sink.host, sink.port, tls="none", username=None)
+
+
+async def run_scenario(client, ctx, name, total, concurrency, warmup):
+    """Send `total` requests with `concurrency` in flight; returns the scenario's results"""
+    make_request = SCENARIOS[name]
+    latencies = []
+    statuses = {}
+    next_index = 0
+
+    async def send(i):
+        method, path, body = make_request(ctx, i)
+        started = perf_counter()
+        response = await client.request(method, path, json=body)
+        return perf_counter() - started, response.status_code
+
+    async def worker():
+        nonlocal next_index
+        while next_index < total:
+            i = warmup + next_index
+            next_index += 1
+            latency, status = await send(i)
+            latencies.append(latency)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    for i in range(warmup):
+        await send(i)
+
+    started = perf_counter()
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, total))])
+    elapsed = perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "min": round(latencies[0] * 1000, 2) if latencies else 0.0,
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0
+        }
+    }
+
+
+async def wait_for_outbox(server, timeout):
+    """Give the outbox worker time to deliver the emails the write scenarios queued"""
+    deadline = perf_counter() + timeout
+    while perf_counter() < deadline:
+        if not await server.db.email_outbox.count_documents({"status": {"$in": ["pending", "sending"]}}):
+            return True
+        await asyncio.sleep(0.2)
+    return False
+
+
+def print_results(results, previous):
+    print_header("RESULTS (latency in ms)")
+    print(f"{'scenario':<20}{'req':>6}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, result in results["scenarios"].items():
+        latency = result["latency_ms"]
+        color = Colors.RED if result["errors"] else Colors.GREEN
+        print(f"{color}{name:<20}{result['requests']:>6}{result['errors']:>6}{result['throughput_rps']:>9}"
+              f"{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}{latency['max']:>9}{Colors.ENDC}")
+
+    if previous:
+        print_header(f"COMPARED TO {previous['started_at']}")
+        for name, result in results["scenarios"].items():
+            before = previous["scenarios"].get(name)
+            if not before:
+                continue
+            p95_change = result["latency_ms"]["p95"] - before["latency_ms"]["p95"]
+            rps_change = result["throughput_rps"] - before["throughput_rps"]
+            color = Colors.RED if p95_change > 0 else Colors.GREEN
+            print(f"{color}{name:<20} p95 {p95_change:+9.2f} ms   throughput {rps_change:+9.1f} rps{Colors.ENDC}")
+
+
+async def main():
+    args = parse_args()
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Unknown scenario(s): {', '.join(unknown)} - choose from {', '.join(SCENARIOS)}")
+    previous = json.loads(Path(args.compare).read_text()) if args.compare else None
+
+    import httpx
+
+    db_name = f"qnova_vr_bench_{uuid.uuid4().hex[:8]}"
+    server = load_server(args, db_name)
+    from smtp_sink import SMTPSink
+
+    ctx = BenchContext(args.days)
+    results = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "days": args.days,
+            "database": "in-memory" if args.in_memory else "mongodb",
+            "email_transport": args.email_transport
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "scenarios": {}
+    }
+
+    async with SMTPSink() as sink:
+        use_smtp_sink(server, sink, args.email_transport)
+        await server.app.router.startup()
+        transport = httpx.ASGITransport(app=server.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+                print_header(f"SETUP: {len(ctx.dates)} days of slots in {db_name}")
+                response = await client.post(f"/api/calendar/generate-slots/range/{ctx.dates[0]}/{ctx.dates[-1]}")
+                response.raise_for_status()
+                slots = await server.db.time_slots.find(
+                    {"date": {"$in": ctx.dates}, "status": "available"}, {"_id": 0, "id": 1}
+                ).to_list(None)
+                ctx.slot_ids = [slot["id"] for slot in slots]
+
+                for name in names:
+                    total = args.requests
+                    warmup = args.warmup
+                    if name == "book_slot":
+                        # Every booking needs its own free slot
+                        warmup = min(warmup, len(ctx.slot_ids))
+                        total = min(total, len(ctx.slot_ids) - warmup)
+                    print(f"{Colors.BLUE}▶ {name}: {total} requests, concurrency {args.concurrency}{Colors.ENDC}")
+                    results["scenarios"][name] = await run_scenario(
+                        client, ctx, name, total, args.concurrency, warmup
+                    )
+
+            drained = await wait_for_outbox(server, timeout=30)
+            results["emails"] = {"delivered_to_sink": len(sink.messages), "outbox_drained": drained}
+        finally:
+            if not args.keep_db:
+                await server.client.drop_database(db_name)
+            # Still inside the sink: the shutdown handlers QUIT pooled SMTP connections on the
+            # email executor, and the sink answers them before dropping whatever is left open
+            await server.app.router.shutdown()
+
+    output = Path(args.output or f"benchmark-results-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.write_text(json.dumps(results, indent=2))
+    print_results(results, previous)
+    print(f"\n{Colors.GREEN}✅ Results saved to {output}{Colors.ENDC}")
+    print(f"📧 {results['emails']['delivered_to_sink']} emails delivered to the SMTP sink")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
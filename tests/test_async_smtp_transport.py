@@ -0,0 +1,50 @@
+"""
+Sends booking emails through the asyncio SMTP transport into the in-process sink.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("aiosmtplib")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+
+BOOKING = {
+    "id": "booking-1",
+    "name": "Anna Schmidt",
+    "email": "anna.schmidt@example.com",
+    "phone": "+49 551 123456",
+    "service": "KAT VR Gaming Session",
+    "date": "2030-01-15",
+    "time": "14:00",
+    "participants": 2,
+    "message": "",
+    "selectedGame": "Beat Saber",
+    "status": "confirmed",
+}
+
+
+def test_concurrent_sends_reuse_a_bounded_number_of_connections():
+    async def run():
+        async with SMTPSink() as sink:
+            transport = server.AsyncSMTPTransport(sink.host, sink.port, tls="none", username=None, max_connections=5)
+            messages = [server.build_customer_confirmation_message({**BOOKING, "id": f"booking-{i}"})
+                        for i in range(200)]
+
+            await asyncio.gather(*[transport.send_message(msg) for msg in messages])
+            await sink.wait_for(200)
+            await transport.close()
+
+            assert transport.sent == 200
+            assert transport.connects <= 5
+            assert {envelope["rcpt_tos"][0] for envelope in sink.envelopes} == {"<anna.schmidt@example.com>"}
+
+    asyncio.run(run())
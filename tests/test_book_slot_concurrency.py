@@ -0,0 +1,100 @@
+"""
+Concurrency test for atomic calendar slot booking.
+
+Requires a reachable MongoDB (MONGO_URL, default mongodb://localhost:27017);
+the test is skipped otherwise. Notifications are captured instead of queued.
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+motor_asyncio = pytest.importorskip("motor.motor_asyncio")
+pymongo = pytest.importorskip("pymongo")
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+PARALLEL_BOOKINGS = 300
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+def mongo_available():
+    try:
+        pymongo.MongoClient(MONGO_URL, serverSelectionTimeoutMS=1000).admin.command("ping")
+        return True
+    except Exception:
+        return False
+
+
+@pytest.fixture
+def server(monkeypatch):
+    if not mongo_available():
+        pytest.skip(f"MongoDB not reachable at {MONGO_URL}")
+
+    os.environ.setdefault("MONGO_URL", MONGO_URL)
+    import server as server_module
+
+    return server_module
+
+
+@pytest.fixture
+def queued_notifications(server, monkeypatch):
+    """Capture post-commit notifications instead of writing them to the outbox"""
+    queued = []
+
+    async def record_notifications(*emails):
+        queued.append(emails)
+
+    monkeypatch.setattr(server.notifications, "after_commit", record_notifications)
+    return queued
+
+
+def test_parallel_bookings_of_one_slot_have_exactly_one_winner(server, queued_notifications, monkeypatch):
+    db_name = f"qnova_vr_test_{uuid.uuid4().hex[:8]}"
+
+    async def run():
+        client = motor_asyncio.AsyncIOMotorClient(MONGO_URL)
+        monkeypatch.setattr(server, "db", client[db_name])
+        try:
+            slot = server.TimeSlot(date="2030-01-15", time="14:00", service_type="KAT VR Gaming Session")
+            await server.db.time_slots.insert_one(slot.dict())
+
+            attempts = [
+                server.book_time_slot(slot.id, {
+                    "name": f"Customer {i}",
+                    "email": f"customer{i}@example.com",
+                    "phone": "+49 123 456789",
+                    "participants": 1
+                })
+                for i in range(PARALLEL_BOOKINGS)
+            ]
+            results = await asyncio.gather(*attempts, return_exceptions=True)
+
+            winners = [r for r in results if isinstance(r, dict)]
+            losers = [r for r in results if isinstance(r, server.HTTPException)]
+            assert len(winners) == 1
+            assert len(losers) == PARALLEL_BOOKINGS - 1
+            assert all(loser.status_code == 400 for loser in losers)
+
+            bookings = await server.db.bookings.find({"date": "2030-01-15", "time": "14:00"}).to_list(None)
+            assert len(bookings) == 1
+            assert bookings[0]["id"] == winners[0]["booking_id"]
+
+            assert len(queued_notifications) == 1
+            assert {kind for kind, _ in queued_notifications[0]} == {
+                "booking_notification", "customer_confirmation"
+            }
+
+            booked_slot = await server.db.time_slots.find_one({"id": slot.id})
+            assert booked_slot["status"] == server.SlotStatus.booked
+            assert booked_slot["booking_id"] == winners[0]["booking_id"]
+        finally:
+            await client.drop_database(db_name)
+            client.close()
+
+    asyncio.run(run())